@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import itertools
 import logging
+import time
 
+import voluptuous as vol
+
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import Platform, CONF_HOST, CONF_PORT, ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 
-from .const import DOMAIN, CONF_BAUD_RATE, CONF_INPUT1_NAME
+from .const import DOMAIN, CONF_BAUD_RATE, CONF_INPUT1_NAME, SERVICE_SEND_COMMANDS, ATTR_COMMANDS, STORAGE_VERSION, \
+    CONFIG_FLOW_HANDOFF, HANDOFF_MAX_AGE, POLL_SLOTS
 from .coordinator import Sw42daCoordinator
-from .sw42da_api import Sw42daApi
+from .error import ServiceError
+from .sw42da_api import PROMPT
+from .sw42da_async_api import Sw42daAsyncApi
+from .util import get_coordinator_by_device_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,41 +39,166 @@ _PLATFORMS: list[Platform] = [
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Blustream SW42DA from a config entry."""
-    controller = Sw42daApi(
-        host_ip=entry.data.get(CONF_HOST),
-        host_port=entry.data.get(CONF_PORT),
-        baud_rate=entry.data.get(CONF_BAUD_RATE)
-    )
+    # taken before anything is awaited, so units set up at the same time don't end up in the same slot
+    poll_slot = _reserve_poll_slot(hass, entry)
+
+    # a new entry can take over the connection and STATUS the config flow has just read
+    status = None
+    handoff = hass.data.get(DOMAIN, {}).get(CONFIG_FLOW_HANDOFF, {}).pop(entry.unique_id, None)
+    if handoff is not None:
+        read_at, status, controller = handoff
+        if time.monotonic() - read_at > HANDOFF_MAX_AGE:
+            status = None
+    else:
+        controller = Sw42daAsyncApi(
+            host_ip=entry.data.get(CONF_HOST),
+            host_port=entry.data.get(CONF_PORT),
+            baud_rate=entry.data.get(CONF_BAUD_RATE)
+        )
     # TODO: try connecting and returning firmware version starts with V
 
+    await _async_migrate_unique_ids(hass, entry)
+
     sw42da_coordinator = Sw42daCoordinator(
         hass=hass,
         controller=controller,
         entry=entry,
+        poll_slot=poll_slot,
     )
 
-    await sw42da_coordinator.async_config_entry_first_refresh()
+    # start from the last saved snapshot and poll in the background, else wait for the device
+    restored = False
+    if status is not None:
+        sw42da_coordinator.async_adopt(status)
+    else:
+        restored = await sw42da_coordinator.async_restore()
+        if not restored:
+            await sw42da_coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = sw42da_coordinator
-    hass.data[DOMAIN]["controller"] = controller
 
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
 
+    if restored:
+        entry.async_create_background_task(
+            hass, sw42da_coordinator.async_staggered_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+
+    if sw42da_coordinator.push_listener is not None:
+        sw42da_coordinator.push_listener.start(
+            lambda coro: entry.async_create_background_task(hass, coro, f"{DOMAIN} push listener {entry.entry_id}")
+        )
+        entry.async_on_unload(sw42da_coordinator.push_listener.async_stop)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+@callback
+def _reserve_poll_slot(hass: HomeAssistant, entry: ConfigEntry) -> int:
+    """Give the entry the lowest poll slot no other entry holds, keeping the one it has if set up again."""
+    slots: dict[str, int] = hass.data.setdefault(DOMAIN, {}).setdefault(POLL_SLOTS, {})
+    if entry.entry_id not in slots:
+        taken = set(slots.values())
+        slots[entry.entry_id] = next(slot for slot in itertools.count() if slot not in taken)
+    return slots[entry.entry_id]
+
+
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Give the entities of units set up as the only SW42DA unique ids based on the unit's MAC."""
+    if entry.unique_id is None:
+        return
+
+    old_prefix = f"{DOMAIN}_"
+
+    @callback
+    def migrate(entity_entry: er.RegistryEntry) -> dict[str, str] | None:
+        if not entity_entry.unique_id.startswith(old_prefix):
+            return None
+        unique_id = f"{entry.unique_id}_{entity_entry.unique_id.removeprefix(old_prefix)}"
+        _LOGGER.debug("Migrating %s unique id to %s", entity_entry.entity_id, unique_id)
+        return {"new_unique_id": unique_id}
+
+    await er.async_migrate_entries(hass, entry.entry_id, migrate)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+REBOOT_DEVICE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): cv.string,
+    }
+)
+
+# one command per item, a line break would send two and leave the second response to be read as the next one's
+_COMMAND = vol.All(cv.string, vol.Match(r"[^\r\n]+\Z", msg="one command per item, without line breaks"))
+
+SEND_COMMANDS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_COMMANDS): vol.All(cv.ensure_list, [_COMMAND], vol.Length(min=1)),
+    }
+)
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
     async def reboot_device(call: ServiceCall) -> None:
-        controller: Sw42daApi = hass.data[DOMAIN]["controller"]
+        if ATTR_DEVICE_ID in call.data:
+            coordinator = await get_coordinator_by_device_id(hass, call.data[ATTR_DEVICE_ID])
+        else:
+            # without a device_id the service reboots the only unit, as it did before several could be set up
+            coordinators = [
+                value for value in hass.data.get(DOMAIN, {}).values() if isinstance(value, Sw42daCoordinator)
+            ]
+            if not coordinators:
+                raise ServiceError("No SW42DA is set up")
+            if len(coordinators) > 1:
+                raise ServiceError("More than one SW42DA is set up, choose the device to reboot")
+            coordinator = coordinators[0]
         _LOGGER.info("Calling service")
-        await hass.async_add_executor_job(controller.send_command, "REBOOT")
+        try:
+            await coordinator.controller.async_send_command("REBOOT")
+        except OSError as err:
+            # the unit may well be restarting, but without its prompt that can't be told from a failure
+            raise ServiceError(f"No reply to REBOOT: {err}") from err
+
+    async def send_commands(call: ServiceCall) -> ServiceResponse:
+        coordinator = await get_coordinator_by_device_id(hass, call.data[ATTR_DEVICE_ID])
+        commands: list[str] = call.data[ATTR_COMMANDS]
+        _LOGGER.info("Sending %s commands", len(commands))
+        try:
+            results = await coordinator.controller.async_send_batch(commands)
+        except (OSError, TimeoutError) as err:
+            raise ServiceError(f"Failed to send commands: {err}") from err
+        # the commands may have changed anything, confirm the state once they are done
+        await coordinator.async_request_refresh()
+        return {
+            "responses": [
+                {
+                    "command": command,
+                    "response": "".join(response).removesuffix(PROMPT.decode()).strip(),
+                    "latency": round(latency, 3),
+                }
+                for command, (response, latency) in zip(commands, results)
+            ]
+        }
 
     # Register our service with Home Assistant.
     hass.services.async_register(
         domain=DOMAIN,
         service='reboot_device',
         service_func=reboot_device,
+        schema=REBOOT_DEVICE_SCHEMA,
+    )
+    hass.services.async_register(
+        domain=DOMAIN,
+        service=SERVICE_SEND_COMMANDS,
+        service_func=send_commands,
+        schema=SEND_COMMANDS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
     return True
@@ -70,8 +206,17 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, _PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: Sw42daCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN][POLL_SLOTS].pop(entry.entry_id, None)
+        if coordinator.push_listener is not None:
+            # it would open the session again as soon as it was closed
+            await coordinator.push_listener.async_stop()
+        await coordinator.controller.async_close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the saved snapshot with the entry, and its poll slot if setting it up failed."""
+    hass.data.get(DOMAIN, {}).get(POLL_SLOTS, {}).pop(entry.entry_id, None)
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
@@ -1,6 +1,5 @@
 """Platform for sensor integration."""
 import logging
-from collections import defaultdict
 from dataclasses import dataclass
 from typing import Callable, Any
 
@@ -11,6 +10,7 @@ from homeassistant.core import HomeAssistant
 
 from . import Sw42daCoordinator
 from .entity import Sw42daEntity
+from .model import StatusSnapshot
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,9 +18,11 @@ _LOGGER = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class Sw42daBinarySensorDescription(BinarySensorEntityDescription):
-    state: Callable[[defaultdict], Any] | None = None
+    state: Callable[[StatusSnapshot], Any] | None = None
     icon_on: str | None = None
     icon_off: str | None = None
+    # where state reads the value from, the state is only written when it changes
+    data_key: tuple | None = None
 
 
 BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
@@ -28,6 +30,7 @@ BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
         key="main_volume_mute",
         name="Main Volume Mute",
         state=lambda data: data["AudioOut"][0]["Mute"]=="On",
+        data_key=("AudioOut", 0, "Mute"),
         icon_on="mdi:volume-mute",
         icon_off="mdi:volume-low",
     ),
@@ -35,6 +38,7 @@ BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
         key="multichannel_line_volume_mute",
         name="Multichannel Line Volume Mute",
         state=lambda data: data["AudioOut"][1]["Mute"]=="On",
+        data_key=("AudioOut", 1, "Mute"),
         icon_on="mdi:volume-mute",
         icon_off="mdi:volume-low",
     ),
@@ -42,6 +46,7 @@ BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
         key="downmix_line_volume_mute",
         name="Downmix Line Volume Mute",
         state=lambda data: data["AudioOut"][2]["Mute"]=="On",
+        data_key=("AudioOut", 2, "Mute"),
         icon_on="mdi:volume-mute",
         icon_off="mdi:volume-low",
     ),
@@ -49,6 +54,7 @@ BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
         key="multichannel_dante_volume_mute",
         name="Multichannel Dante Volume Mute",
         state=lambda data: data["AudioOut"][3]["Mute"]=="On",
+        data_key=("AudioOut", 3, "Mute"),
         icon_on="mdi:volume-mute",
         icon_off="mdi:volume-low",
     ),
@@ -56,6 +62,7 @@ BINARY_SENSORS: tuple[Sw42daBinarySensorDescription, ...] = (
         key="downmix_dante_volume_mute",
         name="Downmix Dante Volume Mute",
         state=lambda data: data["AudioOut"][4]["Mute"]=="On",
+        data_key=("AudioOut", 4, "Mute"),
         icon_on="mdi:volume-mute",
         icon_off="mdi:volume-low",
     ),
@@ -87,8 +94,7 @@ class Sw42daBinarySensor(Sw42daEntity, BinarySensorEntity):
     ) -> None:
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self.entity_id = f"binary_sensor.{DOMAIN}_{entity_description.key}"
-        self._attr_unique_id = f"{DOMAIN}_binary_sensor_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_binary_sensor_{entity_description.key}"
         self._attr_name = entity_description.name
 
     @property
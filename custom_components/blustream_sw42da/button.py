@@ -1,5 +1,4 @@
 """Platform for sensor integration."""
-import asyncio
 import logging
 
 from dataclasses import dataclass
@@ -13,7 +12,7 @@ from homeassistant.core import HomeAssistant
 from . import Sw42daCoordinator, CONF_INPUT1_NAME
 from .entity import Sw42daEntity
 from .const import DOMAIN, CONF_INPUT2_NAME, CONF_INPUT3_NAME, CONF_INPUT4_NAME, INPUT1, INPUT2, INPUT3, INPUT4
-from .model import source_select_command
+from .model import source_select_command, source_select_values
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -82,10 +81,14 @@ class Sw42daButton(Sw42daEntity, ButtonEntity):
         super().__init__(coordinator=coordinator)
         self.source_inputs = source_inputs
         self.entity_description = entity_description
-        self.entity_id = f"button.{DOMAIN}_{entity_description.key}"
-        self._attr_unique_id = f"{DOMAIN}_button_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_button_{entity_description.key}"
         self._attr_name = self._get_name()
 
+    @property
+    def data_keys(self) -> tuple[tuple, ...]:
+        # a button has no state to read, it is only written when it becomes available or unavailable
+        return ()
+
     def _get_name(self):
         name =  self.entity_description.name
         if name.startswith("INPUT"):
@@ -97,11 +100,10 @@ class Sw42daButton(Sw42daEntity, ButtonEntity):
         """Press button."""
         try:
             _LOGGER.debug("Pressing button %s", self._attr_name)
-            await self.hass.async_add_executor_job(
-                self.send_command, self.entity_description.press_command
+            source = list(source_select_command).index(self.entity_description.key) + 1
+            await self.send_command(
+                self.entity_description.press_command, source_select_values(self.coordinator.data, source)
             )
-            await asyncio.sleep(1)
-            await self.coordinator.async_refresh()
         except Exception as err:
             _LOGGER.error("Failed to press %s: %s", self._attr_name, err)
             raise
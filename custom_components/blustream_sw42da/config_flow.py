@@ -2,21 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import ipaddress
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import AbortFlow
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 
 from homeassistant.helpers.device_registry import format_mac
 
-from . import Sw42daApi
-from .const import DOMAIN, CONF_BAUD_RATE, CONF_INPUT1_NAME, CONF_INPUT2_NAME, CONF_INPUT3_NAME, CONF_INPUT4_NAME
+from .sw42da_async_api import Sw42daAsyncApi, async_discover
+from .const import (
+    DOMAIN, CONF_BAUD_RATE, CONF_INPUT1_NAME, CONF_INPUT2_NAME, CONF_INPUT3_NAME, CONF_INPUT4_NAME, CONF_PUSH_UPDATES,
+    CONF_MIN_INTERVAL, CONF_MAX_INTERVAL, CONF_BACKOFF_FACTOR, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL,
+    DEFAULT_BACKOFF_FACTOR, CONFIG_FLOW_HANDOFF, CONF_NETWORK, DISCOVERY_MAX_HOSTS,
+)
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,6 +41,14 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_DISCOVER_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NETWORK, default="192.168.1.0/24"): cv.string,
+        vol.Required(CONF_PORT, default=8000): cv.positive_int,
+        vol.Required(CONF_BAUD_RATE, default=57600): cv.positive_int,
+    }
+)
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
@@ -40,14 +56,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """
     # TODO validate the data can be used to set up a connection.
 
-    # If your PyPI package is not built with async, pass your methods
-    # to the executor:
-    api = Sw42daApi(data[CONF_HOST], data[CONF_PORT], data[CONF_BAUD_RATE])
+    api = Sw42daAsyncApi(data[CONF_HOST], data[CONF_PORT], data[CONF_BAUD_RATE])
 
-    raw = await hass.async_add_executor_job(
-        api.send_command, "STATUS"
-    )
-    result = api.parse_result(raw)
+    try:
+        result = await api.async_probe()
+    except (OSError, asyncio.TimeoutError, ValueError) as err:
+        _LOGGER.debug("No SW42DA at %s:%s: %r", data[CONF_HOST], data[CONF_PORT], err)
+        await api.async_close()
+        raise CannotConnect from err
 
     # hub = PlaceholderHub(data[CONF_HOST], data[CONF_PORT], data[CONF_BAUD_RATE])
     # if not await hub.authenticate(data[CONF_HOST], data[CONF_PORT], data[CONF_BAUD_RATE]):
@@ -59,6 +75,7 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     # InvalidAuth
 
     if not result:
+        await api.async_close()
         raise CannotConnect
 
     # Return info that you want to store in the config entry.
@@ -67,7 +84,10 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         "unique_id": result["Mac"],
         "ip": result["Network"]["IP"],
         "port": int(result["TCP/IP Port"]),
-        "baud_rate": int(result["Baud"])
+        "baud_rate": int(result["Baud"]),
+        # still connected, handed to the new entry with the STATUS so setup doesn't read it again
+        "api": api,
+        "status": result,
     }
 
 
@@ -76,10 +96,76 @@ class Sw42DaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._discovered: dict[str, dict[str, Any]] = {}
+        self._defaults: dict[str, Any] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> Sw42daOptionsFlow:
+        return Sw42daOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
-        """Handle the initial step."""
+        """Handle the initial step, scan for units or enter one by hand."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(self, user_input: dict[str, Any] | None = None):
+        """Probe every host of a network for SW42DAs."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                network = ipaddress.ip_network(user_input[CONF_NETWORK], strict=False)
+            except ValueError:
+                errors["base"] = "invalid_network"
+            else:
+                if network.num_addresses > DISCOVERY_MAX_HOSTS:
+                    errors["base"] = "network_too_large"
+                else:
+                    entries = self._async_current_entries()
+                    # units already set up hold a session Home Assistant keeps open, don't open another
+                    configured_hosts = {entry.data.get(CONF_HOST) for entry in entries}
+                    hosts = [str(host) for host in network.hosts()] or [str(network.network_address)]
+                    hosts = [host for host in hosts if host not in configured_hosts]
+                    units = await async_discover(hosts, user_input[CONF_PORT], user_input[CONF_BAUD_RATE])
+                    configured = {entry.unique_id for entry in entries}
+                    self._discovered = {
+                        format_mac(unit["mac"]): {**unit, CONF_BAUD_RATE: user_input[CONF_BAUD_RATE]}
+                        for unit in units
+                        if format_mac(unit["mac"]) not in configured
+                    }
+                    _LOGGER.info("Found %s new SW42DA units on %s", len(self._discovered), network)
+                    if self._discovered:
+                        return await self.async_step_pick()
+                    errors["base"] = "none_found"
+
+        return self.async_show_form(
+            step_id="discover", data_schema=STEP_DISCOVER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_pick(self, user_input: dict[str, Any] | None = None):
+        """Choose one of the units found, it is then set up like one entered by hand."""
+        if user_input is not None:
+            unit = self._discovered[user_input["unit"]]
+            self._defaults = {
+                CONF_HOST: unit["host"],
+                CONF_PORT: unit["port"],
+                CONF_BAUD_RATE: unit[CONF_BAUD_RATE],
+            }
+            return await self.async_step_manual()
+
+        units = {
+            mac: f"{unit['local'] or 'SW42DA'} ({mac}) at {unit['host']}"
+            for mac, unit in self._discovered.items()
+        }
+        return self.async_show_form(
+            step_id="pick", data_schema=vol.Schema({vol.Required("unit"): vol.In(units)})
+        )
+
+    async def async_step_manual(self, user_input: dict[str, Any] | None = None):
+        """Enter the host of a unit, or confirm one that was found."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            info = None
             try:
                 info = await validate_input(self.hass, user_input)
                 _LOGGER.info(info)
@@ -94,6 +180,9 @@ class Sw42DaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_BAUD_RATE: info["baud_rate"]
                 })
 
+            except AbortFlow:
+                await info["api"].async_close()
+                raise
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -101,11 +190,18 @@ class Sw42DaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except Exception:
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
+                if info is not None:
+                    await info["api"].async_close()
             else:
+                self.hass.data.setdefault(DOMAIN, {}).setdefault(CONFIG_FLOW_HANDOFF, {})[unique_id] = (
+                    time.monotonic(), info["status"], info["api"]
+                )
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="manual",
+            data_schema=self.add_suggested_values_to_schema(STEP_USER_DATA_SCHEMA, self._defaults),
+            errors=errors,
         )
 
     # async def async_step_reconfigure(self, user_input: dict[str, Any] | None = None):
@@ -129,6 +225,40 @@ class Sw42DaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     #     )
 
 
+class Sw42daOptionsFlow(config_entries.OptionsFlow):
+    """Handle the options of a Blustream SW42DA."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "min_above_max"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PUSH_UPDATES, default=options.get(CONF_PUSH_UPDATES, False)
+                    ): cv.boolean,
+                    vol.Required(
+                        CONF_MIN_INTERVAL, default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Required(
+                        CONF_MAX_INTERVAL, default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                    vol.Required(
+                        CONF_BACKOFF_FACTOR, default=options.get(CONF_BACKOFF_FACTOR, DEFAULT_BACKOFF_FACTOR)
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=10)),
+                }
+            ),
+            errors=errors,
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
     pass
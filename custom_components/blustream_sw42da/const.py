@@ -6,6 +6,11 @@ DATA = "data"
 CONF_BAUD_RATE = "baud_rate"
 COORDINATOR_NAME = "sw42da_data"
 
+# seconds after the last command before STATUS is fetched to confirm the optimistic state
+CONFIRM_REFRESH_DELAY = 2
+# minimum seconds between two writes of the same number, e.g. while a volume slider is dragged
+NUMBER_WRITE_INTERVAL = 0.25
+
 INPUT1 = "input1"
 INPUT2 = "input2"
 INPUT3 = "input3"
@@ -16,4 +21,77 @@ CONF_INPUT2_NAME = INPUT2 + "_name"
 CONF_INPUT3_NAME = INPUT3 + "_name"
 CONF_INPUT4_NAME = INPUT4 + "_name"
 
+# the last snapshot of each entry is kept in .storage for the next start
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60
+
+# hass.data[DOMAIN] key of what the config flow read, {unique_id: (time.monotonic(), STATUS dict, open api)}
+CONFIG_FLOW_HANDOFF = "config_flow_handoff"
+# seconds the config flow's STATUS can stand in for the first refresh
+HANDOFF_MAX_AGE = 60
+
+# config flow discovery, a network bigger than this isn't scanned
+CONF_NETWORK = "network"
+DISCOVERY_MAX_HOSTS = 1024
+
+# options
+CONF_PUSH_UPDATES = "push_updates"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_BACKOFF_FACTOR = "backoff_factor"
+
+# adaptive polling, seconds
+DEFAULT_POLL_INTERVAL = 30
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 120
+DEFAULT_BACKOFF_FACTOR = 1.5
+# how long polling stays at the minimum interval after a command or a change
+FAST_POLL_PERIOD = 60
+# an unreachable device backs off up to this many times the maximum interval, give or take POLL_JITTER
+UNREACHABLE_BACKOFF = 4
+POLL_JITTER = 0.1
+# seconds between the polls of units set up together, at the default interval
+POLL_STAGGER = 0.75
+# hass.data[DOMAIN] key of the poll slot each entry has taken, {entry_id: slot}, the lowest free one is taken
+POLL_SLOTS = "poll_slots"
+
+# seconds between the consistency check polls while push updates are on
+PUSH_POLL_INTERVAL = 300
+
+SERVICE_SEND_COMMANDS = "send_commands"
+ATTR_COMMANDS = "commands"
+
 INPUT_COMMAND = ["OUT FR 01", "OUT FR 02", "OUT FR 03", "OUT FR 04"]
+
+# the STATUS values read on every poll, by the entities or to spot a reboot
+# NB add to this when an entity description reads anything new
+STATUS_FIELDS = frozenset({
+    "Power",
+    "Key",
+    "Beep",
+    "LCD",
+    "Temp(C)",
+    "Uptime(Day:Hour:Min:Sec)",
+    "CEC_Control",
+    "Output",
+    "AudioOut",
+})
+
+# identity and network settings, only read, with the rest of STATUS, at startup, after a reboot and every
+# STATIC_REFRESH_INTERVAL
+STATIC_FIELDS = frozenset({
+    "FW Version",
+    "Mac",
+    "Local",
+    "Telnet",
+    "TCP/IP Port",
+    "Baud",
+    "Network",
+})
+STATIC_REFRESH_INTERVAL = 3600
+
+# all a standby poll reads, enough to see the unit being switched on
+STANDBY_FIELDS = frozenset({"Power"})
+
+# values that change between polls on their own, they don't count as the unit being in use
+TICKING_FIELDS = frozenset({"Temp(C)", "Uptime(Day:Hour:Min:Sec)"})
@@ -1,40 +1,323 @@
+import asyncio
 import logging
-from collections import defaultdict
+import random
+import time
 from datetime import timedelta
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import COORDINATOR_NAME
-from .sw42da_api import Sw42daApi
+from .const import (
+    COORDINATOR_NAME,
+    CONF_BACKOFF_FACTOR,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONFIRM_REFRESH_DELAY,
+    DOMAIN,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    FAST_POLL_PERIOD,
+    POLL_JITTER,
+    POLL_STAGGER,
+    PUSH_POLL_INTERVAL,
+    STANDBY_FIELDS,
+    STATIC_FIELDS,
+    STATIC_REFRESH_INTERVAL,
+    STATUS_FIELDS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TICKING_FIELDS,
+    UNREACHABLE_BACKOFF,
+)
+from .model import StatusSnapshot, command_values, uptime_seconds
+from .sw42da_async_api import Sw42daAsyncApi, Sw42daPushListener
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class Sw42daCoordinator(DataUpdateCoordinator[defaultdict]):
+class Sw42daCoordinator(DataUpdateCoordinator[StatusSnapshot]):
     """Sw42da Coordinator"""
 
     def __init__(
             self,
             hass: HomeAssistant,
             entry: ConfigEntry,
-            controller: Sw42daApi
+            controller: Sw42daAsyncApi,
+            poll_slot: int = 0
     ) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator, poll_slot: the unit's place among those set up, see POLL_SLOTS."""
 
         self.controller = controller
         self.hass = hass
+        # a scheduled poll and a requested refresh can overlap, only one reads STATUS at a time
+        self._update_lock = asyncio.Lock()
+
+        # the paths that changed in the last update sent to the entities, None if unknown i.e. everything
+        self.changed: set[tuple] | None = None
+        self._notified_data: StatusSnapshot | None = None
+        self._notified_success = True
+
+        # entities of each unit get unique ids of their own, units set up before the MAC was known keep the old ones
+        self.unique_id_prefix: str = entry.unique_id or DOMAIN
+        # spread the polls of many units, each polls at its own fraction of the interval, poll_offset
+        # seconds into it at the default interval
+        self.poll_phase: float = (poll_slot * POLL_STAGGER / DEFAULT_POLL_INTERVAL) % 1
+        self.poll_offset: float = self.poll_phase * DEFAULT_POLL_INTERVAL
+
+        # the last snapshot, to start from before the device has answered
+        self.store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._save_pending = False
+
+        # when the static tier, identity and network settings, is read again along with the rest of STATUS
+        self._static_due = 0.0
+        self.device_info: DeviceInfo | None = None
+
+        # adaptive polling, fast after a command or a change, slower the longer nothing changes
+        self.min_interval: float = entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        self.max_interval: float = entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+        self.backoff_factor: float = entry.options.get(CONF_BACKOFF_FACTOR, DEFAULT_BACKOFF_FACTOR)
+        self._fast_until = 0.0
+        self._failures = 0
+
+        # with push updates the device reports its changes, polling is only a consistency check
+        self.push_listener: Sw42daPushListener | None = None
+        if entry.options.get(CONF_PUSH_UPDATES, False):
+            self.push_listener = Sw42daPushListener(controller, self._handle_push_line)
+            self.max_interval = max(self.max_interval, PUSH_POLL_INTERVAL)
+        # the adapted interval, update_interval is this moved onto the unit's phase
+        self._interval: float = min(max(DEFAULT_POLL_INTERVAL, self.min_interval), self.max_interval)
 
         super().__init__(
             hass,
             _LOGGER,
             name=COORDINATOR_NAME,
             config_entry=entry,
-            update_interval=timedelta(seconds=30)
+            update_interval=timedelta(seconds=self._interval),
+            # a poll that returns the same snapshot doesn't notify the entities at all
+            always_update=False,
+            # commands confirm their optimistic state with one STATUS after the last of a burst
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=CONFIRM_REFRESH_DELAY, immediate=False
+            ),
         )
 
-    async def _async_update_data(self) -> defaultdict:
-        raw = await self.hass.async_add_executor_job(self.controller.send_command, "STATUS")
-        result = self.controller.parse_result(raw)
-        return result
+    async def async_restore(self) -> bool:
+        """
+
+        Start from the snapshot saved by the last run, if there is one
+
+        The static values count as stale, the first poll reads them again.
+
+        returns: whether a snapshot was restored
+
+        """
+
+        try:
+            stored = await self.store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Ignoring the saved state of %s: %s", self.name, err)
+            return False
+        if not stored:
+            return False
+        try:
+            self.data = self._snapshot(stored, static=True)
+        except (LookupError, TypeError, ValueError, AttributeError) as err:
+            _LOGGER.warning("Ignoring the saved state of %s: %r", self.name, err)
+            return False
+        self._static_due = 0.0
+        _LOGGER.debug("Restored the saved state of %s", self.name)
+        return True
+
+    async def async_staggered_refresh(self) -> None:
+        """Refresh after this unit's poll_offset, so units set up together don't all poll at once."""
+        await asyncio.sleep(self.poll_offset)
+        await self.async_refresh()
+
+    @callback
+    def async_adopt(self, status: dict[str, Any]) -> None:
+        """Use a full STATUS read just before setup, e.g. by the config flow, in place of the first refresh."""
+        self.data = self._snapshot(status, static=True)
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the snapshot as it is in STORAGE_SAVE_DELAY seconds, unless a save is already pending."""
+        # async_delay_save restarts its delay on every call, polls any faster would put the save off until shutdown
+        if not self._save_pending:
+            self._save_pending = True
+            self.store.async_delay_save(self._stored_data, STORAGE_SAVE_DELAY)
+
+    def _stored_data(self) -> dict[str, Any]:
+        self._save_pending = False
+        return self.data.as_dict()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Work out what changed since the entities were last updated, see affects, then update them."""
+        previous, self._notified_data = self._notified_data, self.data
+        if previous is None or self.data is None or self.last_update_success != self._notified_success:
+            self.changed = None
+        else:
+            self.changed = self.data.changes(previous)
+        self._notified_success = self.last_update_success
+        super().async_update_listeners()
+
+    def affects(self, data_keys: tuple[tuple, ...] | None) -> bool:
+        """Whether the current update changed any of data_keys, the snapshot paths an entity reads."""
+        if self.changed is None or data_keys is None:
+            return True
+        return any(
+            change[:len(key)] == key or key[:len(change)] == change
+            for key in data_keys
+            for change in self.changed
+        )
+
+    @callback
+    def async_set_optimistic(self, values: dict[tuple, Any], confirm: bool = True) -> None:
+        """
+
+        Show the expected result of a command straight away and confirm it with a deferred refresh
+
+        values: {path: value} as for StatusSnapshot.with_values, e.g. {("AudioOut", 0, "Mute"): "On"}
+        confirm: False when the device itself reported the values
+
+        """
+
+        if self.data is not None and values:
+            self.data = self.data.with_values(values)
+            self.async_update_listeners()
+        if confirm:
+            self.poll_fast()
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def poll_fast(self) -> None:
+        """Poll at the minimum interval for FAST_POLL_PERIOD, from the next refresh on."""
+        self._fast_until = time.monotonic() + FAST_POLL_PERIOD
+
+    def _adapt_interval(self, snapshot: StatusSnapshot | None) -> None:
+        """
+
+        Set the interval to the next poll from how this one went
+
+        snapshot: the new data, None if the device couldn't be reached
+
+        """
+
+        seconds = self._interval
+        # units that dropped off or went quiet together don't keep polling in step, the caps still hold
+        jitter = random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+        if snapshot is None:
+            self._failures += 1
+            seconds = min(seconds * self.backoff_factor * jitter, self.max_interval * UNREACHABLE_BACKOFF)
+        else:
+            if self._failures or self.data is None or self._changed(snapshot):
+                self.poll_fast()
+            self._failures = 0
+            if time.monotonic() < self._fast_until and snapshot["Power"] != "Off":
+                seconds = self.min_interval
+            else:
+                seconds = min(max(seconds, self.min_interval) * self.backoff_factor * jitter, self.max_interval)
+        self._interval = seconds
+        if snapshot is not None:
+            seconds = self._on_phase(seconds)
+        self.update_interval = timedelta(seconds=seconds)
+
+    def _on_phase(self, seconds: float) -> float:
+        """
+
+        seconds, moved so the poll falls poll_phase into the interval on the monotonic clock
+
+        It is moved by up to half of seconds, later rather than earlier if earlier is below min_interval.
+
+        """
+
+        shift = (self.poll_phase * seconds - time.monotonic() - seconds) % seconds
+        # units on the same interval stay apart instead of drifting into step
+        if shift > seconds / 2 and shift >= self.min_interval:
+            return shift
+        return seconds + shift
+
+    def _changed(self, snapshot: StatusSnapshot) -> bool:
+        """Whether snapshot differs from the current data in more than the temperature and uptime."""
+        return any(path[0] not in TICKING_FIELDS for path in snapshot.changes(self.data))
+
+    @callback
+    def _handle_push_line(self, line: str) -> None:
+        values = command_values(self.data, line)
+        if values is not None:
+            _LOGGER.debug("Device reported %r", line)
+            self.async_set_optimistic(values, confirm=False)
+        else:
+            # something changed that can't be read from the message, fetch STATUS
+            _LOGGER.debug("Device reported %r, refreshing", line)
+            self.hass.async_create_task(self.async_request_refresh())
+
+    async def _async_update_data(self) -> StatusSnapshot:
+        # the interval and the static tier are worked out from the data of the poll before
+        async with self._update_lock:
+            try:
+                snapshot = await self._async_fetch()
+            except (OSError, ValueError) as err:
+                self._adapt_interval(None)
+                raise UpdateFailed(f"Failed to read STATUS: {err!r}") from err
+            _LOGGER.debug("Command queue for %s: %s", self.name, self.controller.queue.metrics())
+            self._async_schedule_save()
+            # the next refresh is scheduled from update_interval as soon as this returns
+            self._adapt_interval(snapshot)
+            _LOGGER.debug("Next poll of %s in %s", self.name, self.update_interval)
+            return snapshot
+
+    async def _async_fetch(self) -> StatusSnapshot:
+        if self.data is not None and self.data["Power"] == "Off" and self.last_update_success:
+            # in standby only the power is read, the rest of the snapshot is kept until the unit wakes up
+            result = await self.controller.async_status_stream(STANDBY_FIELDS)
+            if result.keys() >= STATUS_FIELDS | STATIC_FIELDS:
+                # no parse plan to read just the power with, everything was parsed anyway
+                return self._snapshot(result, static=True)
+            if result.get("Power", "Off") == "Off":
+                return self.data
+            _LOGGER.debug("%s is on again, reading the full STATUS", self.name)
+
+        # the static tier read parses all of STATUS, refreshing the values no poll reads as well
+        static = time.monotonic() >= self._static_due
+        result = await self.controller.async_status_stream(None if static else STATUS_FIELDS)
+        if not static and self._rebooted(result):
+            _LOGGER.debug("%s has restarted, reading its settings again", self.name)
+            result = await self.controller.async_status_stream()
+            static = True
+        return self._snapshot(result, static or result.keys() >= STATIC_FIELDS)
+
+    def _rebooted(self, result: dict[str, Any]) -> bool:
+        if self.data is None:
+            return False
+        uptime = uptime_seconds(result.get("Uptime(Day:Hour:Min:Sec)"))
+        previous = uptime_seconds(self.data.device.uptime)
+        return uptime is not None and previous is not None and uptime < previous
+
+    def _snapshot(self, result: dict[str, Any], static: bool) -> StatusSnapshot:
+        """The snapshot of a poll, static: whether it read the static tier, values it didn't read are kept."""
+        if self.data is None:
+            snapshot = StatusSnapshot.from_status(result)
+        else:
+            # only what the poll read is built again, the rest is shared with the current snapshot
+            snapshot = self.data.updated(result)
+        if static:
+            self._static_due = time.monotonic() + STATIC_REFRESH_INTERVAL
+            self.device_info = DeviceInfo(
+                identifiers={(DOMAIN, snapshot.get("Mac"))},
+                name=snapshot.get("Local") or "SW42DA",
+                manufacturer="Blustream",
+                model="SW42DA",
+                sw_version=snapshot.get("FW Version"),
+                serial_number=snapshot.get("Mac"),
+            )
+        return snapshot
@@ -3,13 +3,14 @@ from __future__ import annotations
 import logging
 
 from datetime import datetime
+from typing import Any
 
-from homeassistant.core import State
+from homeassistant.core import State, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .import Sw42daCoordinator
-from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,20 +20,28 @@ class Sw42daEntity(CoordinatorEntity[Sw42daCoordinator], RestoreEntity):
     last_updated: datetime | None = None
     restored_state: State | None = None
 
-    def send_command(self, command: str):
+    async def send_command(self, command: str, optimistic: dict[tuple, Any] | None = None):
+        """Send a command, then show its expected result (see async_set_optimistic) until STATUS confirms it."""
         _LOGGER.info("Roger that command: " + command)
         coordinator = self.coordinator
-        coordinator.controller.send_command(command)
+        await coordinator.controller.async_send_command(command)
+        coordinator.async_set_optimistic(optimistic or {})
 
     @property
-    def device_info(self) -> dict[str, object]:
-        """Return the device_info of the device."""
-        data = self.coordinator.data
-        return {
-            "identifiers": {(DOMAIN, data["Mac"])},
-            "name": "SW42DA",
-            "manufacturer": "Blustream",
-            "model": "SW42DA",
-            "sw_version": data["FW Version"],
-            "serial_number": data["Mac"],
-        }
+    def data_keys(self) -> tuple[tuple, ...] | None:
+        """The snapshot paths the state is read from, None to write the state on every coordinator update."""
+        data_key = getattr(self.entity_description, "data_key", None)
+        if data_key is None:
+            return None
+        return (data_key,)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state if something it reads from has changed."""
+        if self.coordinator.affects(self.data_keys):
+            super()._handle_coordinator_update()
+
+    @property
+    def device_info(self) -> DeviceInfo | None:
+        """Return the device_info of the device, built by the coordinator when it reads the static values."""
+        return self.coordinator.device_info
@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
 from .const import INPUT1, INPUT2, INPUT3, INPUT4
 
 source_select_command = {
@@ -5,4 +10,427 @@ source_select_command = {
     INPUT2: "OUT FR 02",
     INPUT3: "OUT FR 03",
     INPUT4: "OUT FR 04",
-}
\ No newline at end of file
+}
+
+# the switch commands of the single STATUS values: label
+_SWITCH_LABELS = {
+    "KEY": "Key",
+    "BEEP": "Beep",
+    "LCD": "LCD",
+    "CEC": "CEC_Control",
+}
+
+# AudioOut rows: 0 main, OUT 21-24 1-4
+_AUDIO_OUT = r"(?:OUT 2([1-4]) )?"
+_COMMAND_PATTERNS = (
+    (re.compile(r"P(ON|OFF)"), lambda m: {("Power",): m[1].title()}),
+    (re.compile(_AUDIO_OUT + r"MUTE (ON|OFF)"), lambda m: {("AudioOut", int(m[1] or 0), "Mute"): m[2].title()}),
+    (re.compile(_AUDIO_OUT + r"VOL (\d{1,3})"), lambda m: {("AudioOut", int(m[1] or 0), "Volume"): int(m[2])}),
+    (re.compile(r"(KEY|BEEP|LCD|CEC) (ON|OFF)"), lambda m: {(_SWITCH_LABELS[m[1]],): m[2].title()}),
+)
+_SOURCE_PATTERN = re.compile(r"OUT FR 0?([1-4])")
+_FEEDBACK_PREFIX = re.compile(r"^(?:SW42DA>)?\s*(?:\[\w+\]\s*)?")
+
+
+class StatusRecord:
+    """
+
+    A block or table row of the STATUS output with typed, slotted attributes
+
+    _FIELDS maps each STATUS label to its attribute. Values can still be read and written by label, e.g.
+    row["Volume"], so the entity description lambdas written against the parsed dict keep working.
+    Labels a firmware adds that aren't known here are kept in extra.
+
+    """
+
+    __slots__ = ("extra",)
+
+    _FIELDS: dict[str, str] = {}
+
+    extra: dict[str, Any]
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> StatusRecord:
+        record = cls.__new__(cls)
+        for attr in cls._FIELDS.values():
+            setattr(record, attr, None)
+        record.extra = {}
+        for label, value in values.items():
+            attr = cls._FIELDS.get(label)
+            if attr is None:
+                record.extra[label] = value
+            else:
+                setattr(record, attr, value)
+        return record
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**{label: getattr(self, attr) for label, attr in self._FIELDS.items()}, **self.extra}
+
+    def copy(self) -> StatusRecord:
+        return self.from_dict(self.as_dict())
+
+    def updated(self, values: dict[str, Any]) -> StatusRecord:
+        """A copy with values, {label: value}, replaced, without going through a dict of every label."""
+        record = self.__class__.__new__(self.__class__)
+        for attr in self._FIELDS.values():
+            setattr(record, attr, getattr(self, attr))
+        record.extra = dict(self.extra)
+        for label, value in values.items():
+            record[label] = value
+        return record
+
+    def __getitem__(self, label: str) -> Any:
+        attr = self._FIELDS.get(label)
+        if attr is None:
+            return self.extra[label]
+        return getattr(self, attr)
+
+    def __setitem__(self, label: str, value: Any) -> None:
+        attr = self._FIELDS.get(label)
+        if attr is None:
+            self.extra[label] = value
+        else:
+            setattr(self, attr, value)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._FIELDS or label in self.extra
+
+    def get(self, label: str, default: Any = None) -> Any:
+        try:
+            return self[label]
+        except KeyError:
+            return default
+
+    def changes(self, previous: StatusRecord) -> list[str]:
+        """The labels whose value differs from previous."""
+        if previous is self:
+            return []
+        changed = [label for label, attr in self._FIELDS.items() if getattr(self, attr) != getattr(previous, attr)]
+        if self.extra or previous.extra:
+            changed.extend(label for label in self.extra.keys() | previous.extra.keys()
+                           if self.extra.get(label) != previous.extra.get(label))
+        return changed
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return other is self or (
+            all(getattr(self, attr) == getattr(other, attr) for attr in self._FIELDS.values())
+            and self.extra == other.extra
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class DeviceStatus(StatusRecord):
+    """The single values of the STATUS output, power, front panel, CEC, audio processing and identity."""
+
+    __slots__ = (
+        "fw_version", "power", "ir", "ir_mode", "key", "beep", "lcd", "lcd_pause_time", "pwled_follow", "baud",
+        "temperature", "uptime", "arc_mode", "optical_sel", "optical_en", "out_mode", "audio", "cec_control",
+        "cec_control_by", "cec_steps", "multichannel_out_from", "two_channel_out_from", "drc", "surround_decoder",
+        "speaker_virtualizer", "telnet", "tcp_ip_port", "mac", "local",
+    )
+
+    _FIELDS = {
+        "FW Version": "fw_version",
+        "Power": "power",
+        "IR": "ir",
+        "IR_Mode": "ir_mode",
+        "Key": "key",
+        "Beep": "beep",
+        "LCD": "lcd",
+        "LCD_PauseTime(S)": "lcd_pause_time",
+        "PWLED_Follow": "pwled_follow",
+        "Baud": "baud",
+        "Temp(C)": "temperature",
+        "Uptime(Day:Hour:Min:Sec)": "uptime",
+        "ARC_Mode": "arc_mode",
+        "OpticalSel": "optical_sel",
+        "OpticalEn": "optical_en",
+        "OutMode": "out_mode",
+        "Audio": "audio",
+        "CEC_Control": "cec_control",
+        "CEC_ControlBy": "cec_control_by",
+        "CEC_Steps": "cec_steps",
+        "MultiChannelOutFrom": "multichannel_out_from",
+        "2ChannelOutFrom": "two_channel_out_from",
+        "DRC": "drc",
+        "SurroundDecoder(Upmixer)": "surround_decoder",
+        "SpeakerVirtualizer": "speaker_virtualizer",
+        "Telnet": "telnet",
+        "TCP/IP Port": "tcp_ip_port",
+        "Mac": "mac",
+        "Local": "local",
+    }
+
+
+class InputRow(StatusRecord):
+    __slots__ = ("input",)
+
+    _FIELDS = {
+        "Input": "input",
+    }
+
+
+class OutputRow(StatusRecord):
+    """A row of the Output routing table."""
+
+    __slots__ = ("output", "from_in", "hdmi_con", "output_en", "osp", "output_scaler", "audio_signal")
+
+    _FIELDS = {
+        "Output": "output",
+        "FromIn": "from_in",
+        "HDMIcon": "hdmi_con",
+        "OutputEn": "output_en",
+        "OSP": "osp",
+        "OutputScaler": "output_scaler",
+        "AudioSignal": "audio_signal",
+    }
+
+
+class AudioOutRow(StatusRecord):
+    """A row of the AudioOut table, main volume then the line and Dante group volumes."""
+
+    __slots__ = ("name", "volume", "mute")
+
+    _FIELDS = {
+        "AudioOut": "name",
+        "Volume": "volume",
+        "Mute": "mute",
+    }
+
+
+class LineOutputRow(StatusRecord):
+    """A single channel of the analogue line outputs."""
+
+    __slots__ = ("name", "volume", "mute", "delay_ms", "group_control_en", "cec_control_en")
+
+    _FIELDS = {
+        "Line Output": "name",
+        "Volume": "volume",
+        "Mute": "mute",
+        "Delay(Ms)": "delay_ms",
+        "GroupControlEn": "group_control_en",
+        "CEC_ControlEn": "cec_control_en",
+    }
+
+
+class DanteOutputRow(StatusRecord):
+    """A single channel of the Dante outputs."""
+
+    __slots__ = ("name", "volume", "mute", "delay_ms", "group_control_en", "cec_control_en")
+
+    _FIELDS = {
+        "Dante Output": "name",
+        "Volume": "volume",
+        "Mute": "mute",
+        "Delay(Ms)": "delay_ms",
+        "GroupControlEn": "group_control_en",
+        "CEC_ControlEn": "cec_control_en",
+    }
+
+
+class NetworkInfo(StatusRecord):
+    """The network settings in use, the DHCP lease or the static settings."""
+
+    __slots__ = ("dhcp", "ip", "gateway", "subnet_mask")
+
+    _FIELDS = {
+        "DHCP": "dhcp",
+        "IP": "ip",
+        "Gateway": "gateway",
+        "Subnet Mask": "subnet_mask",
+    }
+
+
+class StatusSnapshot:
+    """
+
+    Everything read from one STATUS poll, published by Sw42daCoordinator
+
+    snapshot["AudioOut"][3]["Volume"] still works while entities move over to snapshot.audio_out[3].volume
+
+    """
+
+    __slots__ = ("device", "inputs", "outputs", "audio_out", "line_output", "dante_output", "network")
+
+    # parsed result key: (attribute, row type)
+    _TABLES: dict[str, tuple[str, type[StatusRecord]]] = {
+        "Input": ("inputs", InputRow),
+        "Output": ("outputs", OutputRow),
+        "AudioOut": ("audio_out", AudioOutRow),
+        "LineOutput": ("line_output", LineOutputRow),
+        "DanteOutput": ("dante_output", DanteOutputRow),
+    }
+
+    device: DeviceStatus
+    inputs: tuple[InputRow, ...]
+    outputs: tuple[OutputRow, ...]
+    audio_out: tuple[AudioOutRow, ...]
+    line_output: tuple[LineOutputRow, ...]
+    dante_output: tuple[DanteOutputRow, ...]
+    network: NetworkInfo
+
+    @classmethod
+    def from_status(cls, status: dict[str, Any]) -> StatusSnapshot:
+        """Build a snapshot from the dict returned by Sw42daApi.parse_result."""
+        snapshot = cls.__new__(cls)
+        device = {}
+        for key, value in status.items():
+            if key in cls._TABLES:
+                attr, row_type = cls._TABLES[key]
+                setattr(snapshot, attr, tuple(row_type.from_dict(row) for row in value))
+            elif key == "Network":
+                snapshot.network = NetworkInfo.from_dict(value)
+            else:
+                device[key] = value
+        snapshot.device = DeviceStatus.from_dict(device)
+        for attr, _ in cls._TABLES.values():
+            if not hasattr(snapshot, attr):
+                setattr(snapshot, attr, ())
+        if not hasattr(snapshot, "network"):
+            snapshot.network = NetworkInfo.from_dict({})
+        return snapshot
+
+    def as_dict(self) -> dict[str, Any]:
+        """The snapshot in the shape Sw42daApi.parse_result returns."""
+        status = self.device.as_dict()
+        status["Network"] = self.network.as_dict()
+        for key, (attr, _) in self._TABLES.items():
+            status[key] = [row.as_dict() for row in getattr(self, attr)]
+        return status
+
+    def copy(self) -> StatusSnapshot:
+        return self.from_status(self.as_dict())
+
+    def updated(self, status: dict[str, Any]) -> StatusSnapshot:
+        """
+
+        The snapshot with the values of a poll replaced, the snapshot itself is left as it is
+
+        status: a parse_result dict, possibly only some of its keys, what it doesn't have is shared with this
+            snapshot rather than copied
+
+        """
+
+        snapshot = self.__class__.__new__(self.__class__)
+        for attr in self.__slots__:
+            setattr(snapshot, attr, getattr(self, attr))
+        device = {}
+        for key, value in status.items():
+            if key in self._TABLES:
+                attr, row_type = self._TABLES[key]
+                setattr(snapshot, attr, tuple(row_type.from_dict(row) for row in value))
+            elif key == "Network":
+                snapshot.network = NetworkInfo.from_dict(value)
+            else:
+                device[key] = value
+        if device:
+            snapshot.device = self.device.updated(device)
+        return snapshot
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._TABLES:
+            return getattr(self, self._TABLES[key][0])
+        if key == "Network":
+            return self.network
+        return self.device[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.device[key] = value
+
+    def with_values(self, values: dict[tuple, Any]) -> StatusSnapshot:
+        """
+
+        A copy of the snapshot with some values replaced, the snapshot itself is left as it is
+
+        values: {path: value}, e.g. {("AudioOut", 0, "Volume"): 40, ("Power",): "On"}
+
+        """
+
+        snapshot = self.copy()
+        for path, value in values.items():
+            *parents, label = path
+            target = snapshot
+            for step in parents:
+                target = target[step]
+            target[label] = value
+        return snapshot
+
+    def changes(self, previous: StatusSnapshot) -> set[tuple]:
+        """
+
+        The paths of the values that differ from previous
+
+        returns: e.g. {("Power",), ("AudioOut", 0, "Volume")}, a table whose rows were added or removed is
+            given as a whole, e.g. ("AudioOut",)
+
+        """
+
+        changed = {(label,) for label in self.device.changes(previous.device)}
+        changed.update(("Network", label) for label in self.network.changes(previous.network))
+        for key, (attr, _) in self._TABLES.items():
+            rows, previous_rows = getattr(self, attr), getattr(previous, attr)
+            if rows is previous_rows:
+                continue
+            if len(rows) != len(previous_rows):
+                changed.add((key,))
+                continue
+            for i, row in enumerate(rows):
+                changed.update((key, i, label) for label in row.changes(previous_rows[i]))
+        return changed
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._TABLES or key == "Network" or key in self.device
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StatusSnapshot):
+            return NotImplemented
+        # tables shared with a previous snapshot compare by identity
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+
+def source_select_values(data: StatusSnapshot | None, source: int) -> dict[tuple, int]:
+    """The optimistic result of a source_select_command, every output is switched to the source (1-4)."""
+    if data is None:
+        return {}
+    return {("Output", i, "FromIn"): source for i in range(len(data.outputs))}
+
+
+def command_values(data: StatusSnapshot | None, line: str) -> dict[tuple, Any] | None:
+    """
+
+    The state a command, or the device reporting one, leads to
+
+    line: e.g. "OUT 21 VOL 40", "[SUCCESS] MUTE ON" or "SW42DA>PON"
+
+    returns: {path: value} as for StatusSnapshot.with_values, None if the command isn't known
+
+    """
+
+    command = _FEEDBACK_PREFIX.sub("", line).strip().upper()
+    source = _SOURCE_PATTERN.fullmatch(command)
+    if source is not None:
+        return source_select_values(data, int(source[1]))
+    for pattern, values in _COMMAND_PATTERNS:
+        match = pattern.fullmatch(command)
+        if match is not None:
+            return values(match)
+    return None
+
+
+def uptime_seconds(uptime: str | None) -> int | None:
+    """The STATUS Uptime(Day:Hour:Min:Sec) in seconds, e.g. "0000:01:07:46" is 4066, None if it can't be read."""
+    try:
+        days, hours, minutes, seconds = (int(part) for part in uptime.split(":"))
+    except (AttributeError, ValueError):
+        return None
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
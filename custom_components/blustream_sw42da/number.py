@@ -1,6 +1,7 @@
 """Platform for sensor integration."""
+import asyncio
 import logging
-from collections import defaultdict
+import time
 from dataclasses import dataclass
 from typing import Callable, Any
 
@@ -10,7 +11,8 @@ from homeassistant.core import HomeAssistant
 
 from . import Sw42daCoordinator
 from .entity import Sw42daEntity
-from .const import DOMAIN
+from .model import StatusSnapshot
+from .const import DOMAIN, NUMBER_WRITE_INTERVAL
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,7 +20,9 @@ _LOGGER = logging.getLogger(__name__)
 @dataclass(frozen=True)
 class Sw42daNumberDescription(NumberEntityDescription):
     update_command: str | None = None
-    state: Callable[[defaultdict], Any] | None = None
+    state: Callable[[StatusSnapshot], Any] | None = None
+    # where state reads the value from, set optimistically when the value is changed
+    data_key: tuple | None = None
 
 NUMBERS: tuple[Sw42daNumberDescription, ...] = (
     Sw42daNumberDescription(
@@ -26,6 +30,7 @@ NUMBERS: tuple[Sw42daNumberDescription, ...] = (
         name="Main Volume",
         native_unit_of_measurement=PERCENTAGE,
         state=lambda data: data["AudioOut"][0]["Volume"],
+        data_key=("AudioOut", 0, "Volume"),
         update_command="VOL XX",
     ),
     Sw42daNumberDescription(
@@ -33,6 +38,7 @@ NUMBERS: tuple[Sw42daNumberDescription, ...] = (
         name="Multichannel Line Volume",
         native_unit_of_measurement=PERCENTAGE,
         state=lambda data: data["AudioOut"][1]["Volume"],
+        data_key=("AudioOut", 1, "Volume"),
         update_command="OUT 21 VOL XX",
     ),
     Sw42daNumberDescription(
@@ -40,6 +46,7 @@ NUMBERS: tuple[Sw42daNumberDescription, ...] = (
         name="Downmix Line Volume",
         native_unit_of_measurement=PERCENTAGE,
         state=lambda data: data["AudioOut"][2]["Volume"],
+        data_key=("AudioOut", 2, "Volume"),
         update_command="OUT 22 VOL XX",
     ),
     Sw42daNumberDescription(
@@ -47,6 +54,7 @@ NUMBERS: tuple[Sw42daNumberDescription, ...] = (
         name="Multichannel Dante Volume",
         native_unit_of_measurement=PERCENTAGE,
         state=lambda data: data["AudioOut"][3]["Volume"],
+        data_key=("AudioOut", 3, "Volume"),
         update_command="OUT 23 VOL XX",
     ),
     Sw42daNumberDescription(
@@ -54,6 +62,7 @@ NUMBERS: tuple[Sw42daNumberDescription, ...] = (
         name="Downmix Dante Volume",
         native_unit_of_measurement=PERCENTAGE,
         state=lambda data: data["AudioOut"][4]["Volume"],
+        data_key=("AudioOut", 4, "Volume"),
         update_command="OUT 24 VOL XX",
     ),
 )
@@ -82,36 +91,69 @@ class Sw42daNumber(Sw42daEntity, NumberEntity):
     ) -> None:
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self.entity_id = f"number.{DOMAIN}_{entity_description.key}"
-        self._attr_unique_id = f"{DOMAIN}_number_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_number_{entity_description.key}"
         self._attr_name = entity_description.name
         self._attr_native_min_value = 0
         self._attr_native_max_value = 100
         self._attr_native_step = 1
         self._attr_native_unit_of_measurement = entity_description.unit_of_measurement
+        # the latest value asked for that hasn't been sent yet, and the task sending it
+        self._pending_value: int | None = None
+        self._writer: asyncio.Task | None = None
+        self._last_write = 0.0
 
     @property
     def native_value(self) -> float | None:
         """Return the entity value to represent the entity state."""
+        if self._pending_value is not None:
+            return float(self._pending_value)
         if self.entity_description.state is None:
             return None
         value = float(self.entity_description.state(self.coordinator.data))
         return value
 
     async def async_set_native_value(self, value: float) -> None:
-        """Update the current value."""
+        """
+
+        Update the current value
+
+        While a write is in progress only the latest value is kept, it is sent at most every
+        NUMBER_WRITE_INTERVAL seconds. Every caller waits until the last value has been sent.
+
+        """
+
+        self._pending_value = int(value)
+        self.async_write_ha_state()
+        if self._writer is None or self._writer.done():
+            self._writer = self.hass.async_create_task(self._async_write_pending())
+        await asyncio.shield(self._writer)
+
+    async def _async_write_pending(self) -> None:
         try:
-            _LOGGER.info("The number has changed, update Api")
-            await self.hass.async_add_executor_job(
-                self.send_command, self.entity_description.update_command.replace("XX", str(int(value)))
-            )
-            await self.coordinator.async_refresh()
-
-        except Exception as err:
-            _LOGGER.error(
-                "Failed to set value for %s to %s: %s",
-                self._attr_unique_id,
-                value,
-                err,
-            )
-            raise
+            while self._pending_value is not None:
+                wait = self._last_write + NUMBER_WRITE_INTERVAL - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                value = self._pending_value
+                self._last_write = time.monotonic()
+                try:
+                    _LOGGER.info("The number has changed, update Api")
+                    optimistic = {}
+                    if self.entity_description.data_key is not None:
+                        optimistic[self.entity_description.data_key] = value
+                    await self.send_command(self.entity_description.update_command.replace("XX", str(value)), optimistic)
+
+                except Exception as err:
+                    _LOGGER.error(
+                        "Failed to set value for %s to %s: %s",
+                        self._attr_unique_id,
+                        value,
+                        err,
+                    )
+                    raise
+                if self._pending_value == value:
+                    self._pending_value = None
+        finally:
+            # on failure drop the value that couldn't be sent, the coordinator data shows what the device has
+            self._pending_value = None
+            self.async_write_ha_state()
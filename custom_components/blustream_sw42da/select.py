@@ -10,7 +10,7 @@ from homeassistant.core import HomeAssistant, callback
 from . import Sw42daCoordinator, CONF_INPUT1_NAME
 from .entity import Sw42daEntity
 from .const import DOMAIN, CONF_INPUT2_NAME, CONF_INPUT3_NAME, CONF_INPUT4_NAME
-from .model import source_select_command
+from .model import source_select_command, source_select_values
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,13 +56,16 @@ class Sw42daSelect(Sw42daEntity, SelectEntity):
         super().__init__(coordinator=coordinator)
 
         self.entity_description = entity_description
-        self.entity_id = f"select.{DOMAIN}_{entity_description.key}"
 
-        self._attr_unique_id = f"{DOMAIN}_select_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_select_{entity_description.key}"
         self._attr_name = "Source Input"
         self._attr_options = options
         self._attr_current_option: str | None
 
+    @property
+    def data_keys(self) -> tuple[tuple, ...]:
+        return (("Output", 0, "FromIn"),)
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Update attributes when the coordinator updates."""
@@ -91,11 +94,13 @@ class Sw42daSelect(Sw42daEntity, SelectEntity):
     async def async_select_option(self, option: str) -> None:
         """Update the current value."""
         command = ""
+        source = 0
         try:
             _LOGGER.info("Selecting option for %s", self._attr_name)
             for i in range(len(self._attr_options)):
                 if option == self._attr_options[i]:
                     command = list(source_select_command.values())[i]
+                    source = i + 1
         except Exception as err:
             _LOGGER.error(
                 "Failed to set option for %s to %s: %s",
@@ -104,9 +109,6 @@ class Sw42daSelect(Sw42daEntity, SelectEntity):
                 err,
             )
             raise
-        if command:
-            await self.hass.async_add_executor_job(
-                self.send_command, command
-            )
         self._attr_current_option = option
-        await self.coordinator.async_refresh()
+        if command:
+            await self.send_command(command, source_select_values(self.coordinator.data, source))
@@ -1,7 +1,6 @@
 """Platform for sensor integration."""
 import logging
 
-from collections import defaultdict
 from dataclasses import dataclass
 from typing import Callable, Any
 import voluptuous as vol
@@ -17,6 +16,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import StateType
 from . import CONF_BAUD_RATE
 from .entity import Sw42daEntity
+from .model import StatusSnapshot
 
 from .const import DOMAIN
 from .coordinator import Sw42daCoordinator
@@ -33,8 +33,10 @@ _LOGGER = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class Sw42daSensorDescription(SensorEntityDescription):
-    state: Callable[[defaultdict], Any] | None = None
+    state: Callable[[StatusSnapshot], Any] | None = None
     format: Callable[[Any], Any] | None = None
+    # where state reads the value from, the state is only written when it changes
+    data_key: tuple | None = None
 
 
 SENSORS: tuple[Sw42daSensorDescription, ...] = (
@@ -46,30 +48,35 @@ SENSORS: tuple[Sw42daSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         state=lambda data: data["Temp(C)"],
+        data_key=("Temp(C)",),
         format=lambda value: value.replace("C", ""),
     ),
     Sw42daSensorDescription(
         key="mac_address",
         name="MAC Address",
         state=lambda data: data["Mac"],
+        data_key=("Mac",),
         icon="mdi:network-outline"
     ),
     Sw42daSensorDescription(
         key="source_input",
         name="Source Input",
         state=lambda data: data["Output"][0]["FromIn"],
+        data_key=("Output", 0, "FromIn"),
         icon="mdi:hdmi-port"
     ),
     Sw42daSensorDescription(
         key="local_name",
         name="Local Name",
         state=lambda data: data["Local"],
+        data_key=("Local",),
         icon="mdi:audio-video"
     ),
     Sw42daSensorDescription(
         key="main_volume",
         name="Main Volume",
         state=lambda data: data["AudioOut"][0]["Volume"],
+        data_key=("AudioOut", 0, "Volume"),
         native_unit_of_measurement=PERCENTAGE,
         icon="volume"
     ),
@@ -77,6 +84,7 @@ SENSORS: tuple[Sw42daSensorDescription, ...] = (
         key="multichannel_line_volume",
         name="Multichannel Line Volume",
         state=lambda data: data["AudioOut"][1]["Volume"],
+        data_key=("AudioOut", 1, "Volume"),
         native_unit_of_measurement=PERCENTAGE,
         icon="volume"
     ),
@@ -84,6 +92,7 @@ SENSORS: tuple[Sw42daSensorDescription, ...] = (
         key="downmix_line_volume",
         name="Downmix Line Volume",
         state=lambda data: data["AudioOut"][2]["Volume"],
+        data_key=("AudioOut", 2, "Volume"),
         native_unit_of_measurement=PERCENTAGE,
         icon="volume"
     ),
@@ -91,6 +100,7 @@ SENSORS: tuple[Sw42daSensorDescription, ...] = (
         key="multichannel_dante_volume",
         name="Multichannel Dante Volume",
         state=lambda data: data["AudioOut"][3]["Volume"],
+        data_key=("AudioOut", 3, "Volume"),
         native_unit_of_measurement=PERCENTAGE,
         icon="volume"
     ),
@@ -98,6 +108,7 @@ SENSORS: tuple[Sw42daSensorDescription, ...] = (
         key="downmix_dante_volume",
         name="Downmix Dante Volume",
         state=lambda data: data["AudioOut"][4]["Volume"],
+        data_key=("AudioOut", 4, "Volume"),
         native_unit_of_measurement=PERCENTAGE,
         icon="volume"
     ),
@@ -129,8 +140,7 @@ class Sw42daSensor(Sw42daEntity, SensorEntity):
         super().__init__(coordinator=coordinator)
 
         self.entity_description = entity_description
-        self.entity_id = f"sensor.{DOMAIN}_{entity_description.key}"
-        self._attr_unique_id = f"{DOMAIN}_sensor_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_sensor_{entity_description.key}"
         self._attr_name = entity_description.name
 
     @property
@@ -1,8 +1,47 @@
 import logging
+import re
+import threading
+import time
+from collections.abc import Collection
+from dataclasses import dataclass
+from operator import itemgetter
+
 import serial
 
 _LOGGER = logging.getLogger(__name__)
 
+PROMPT = b"SW42DA>"
+# overall time allowed for a command's response to end with the prompt
+COMMAND_TIMEOUT = 5.0
+# time allowed for the login banner when a session is opened
+BANNER_TIMEOUT = 0.3
+
+# a column label or value, these may contain single spaces but columns are at least two spaces apart
+_COLUMN = re.compile(r"\S+(?: \S+)*")
+
+@dataclass(frozen=True, slots=True)
+class ParsePlan:
+    """
+
+    Where everything sits in the STATUS output for one firmware version and layout
+
+    headers: (line number, text) of the FW Version line and of every header row, the plan only applies
+    while all of them are unchanged
+    scalars: (value row line number, column layout, ((key, column), ...)) for each header row of single keys
+    tables: (result key, header line number, labels, column layout, row count) for each table
+    order: the keys of the parsed result, in the order parse_result has always returned them
+    encoded_headers: headers as bytes, for checking a raw response in parse_status
+
+    """
+
+    fw_version: str | None
+    headers: tuple[tuple[int, str], ...]
+    encoded_headers: tuple[tuple[int, bytes], ...]
+    scalars: tuple[tuple[int, tuple, tuple[tuple[str, int], ...]], ...]
+    tables: tuple[tuple[str, int, list[str], tuple, int], ...]
+    order: tuple[str, ...]
+
+
 class Sw42daApi:
 
     def __init__(
@@ -12,14 +51,27 @@ class Sw42daApi:
             baud_rate: int
     ):
 
+        self._host = host_ip
+        self._port = host_port
         self._url = f"socket://{host_ip}:{host_port}"
         self._baud_rate = baud_rate
 
-    def send_command(self, c: str):
-        if not c.endswith("\n"):
-            c = c + "\n"
-        b = bytes(c, "UTF-8")
-        ser = serial.serial_for_url(
+        # one telnet session is kept open and shared by every command
+        self._serial: serial.SerialBase | None = None
+        self._lock = threading.Lock()
+        self.connect_count = 0
+        self.reuse_count = 0
+
+        # learnt from the first STATUS, rebuilt whenever the layout changes
+        self._parse_plan: ParsePlan | None = None
+
+    def _connection(self) -> tuple[serial.SerialBase, bool]:
+        """Return the open session, connecting first if needed, and whether it was reused."""
+        if self._serial is not None and self._serial.is_open:
+            self.reuse_count += 1
+            return self._serial, True
+
+        self._serial = serial.serial_for_url(
             url=self._url,
             stopbits=1,
             bytesize=8,
@@ -27,80 +79,317 @@ class Sw42daApi:
             parity="N",
             timeout=0.5
         )
+        self.connect_count += 1
+        _LOGGER.debug("Connected to %s (connects: %s, reuses: %s)", self._url, self.connect_count, self.reuse_count)
+        try:
+            # swallow the login banner so its prompt is not taken as the end of the first response
+            self._read_until_prompt(self._serial, BANNER_TIMEOUT)
+        except TimeoutError:
+            pass
+        return self._serial, False
+
+    def _disconnect(self):
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except serial.SerialException as err:
+                _LOGGER.debug("Error closing connection to %s: %s", self._url, err)
+            self._serial = None
+
+    def close(self):
+        """Close the telnet session, the next command will reconnect."""
+        with self._lock:
+            self._disconnect()
+        _LOGGER.debug("Closed %s (connects: %s, reuses: %s)", self._url, self.connect_count, self.reuse_count)
+
+    def send_command(self, c: str):
+        return self._split_response(self.send_raw(c))
+
+    def send_raw(self, c: str) -> bytes:
+        """Send a command and return the undecoded response, ending with the prompt."""
+        if not c.endswith("\n"):
+            c = c + "\n"
+        b = bytes(c, "UTF-8")
+        with self._lock:
+            ser, reused = self._connection()
+            try:
+                return self._exchange(ser, b)
+            except (serial.SerialException, ConnectionError) as err:
+                self._disconnect()
+                if not reused:
+                    raise
+                # the device dropped the idle session, reconnect and try once more
+                _LOGGER.debug("Connection to %s dropped (%s), reconnecting", self._url, err)
+                ser, _ = self._connection()
+                try:
+                    return self._exchange(ser, b)
+                except OSError:
+                    self._disconnect()
+                    raise
+            except OSError:
+                # a timeout may have been written and acted on, resending could run it twice
+                self._disconnect()
+                raise
+
+    @classmethod
+    def _exchange(cls, ser: serial.SerialBase, b: bytes) -> bytes:
+        # throw away anything left over from a previous command
+        ser.reset_input_buffer()
         ser.write(b)
-        response = []
+        return cls._read_until_prompt(ser, COMMAND_TIMEOUT)
+
+    @staticmethod
+    def _read_until_prompt(ser: serial.SerialBase, timeout: float) -> bytes:
+        """
+        Read until the SW42DA> prompt arrives, the prompt has no newline after it so readline() can't be used.
+
+        raises TimeoutError if the prompt hasn't arrived within timeout seconds
+        """
+        deadline = time.monotonic() + timeout
+        buffer = bytearray()
         while True:
-            line = ser.readline()
-            if line:
-                string = line.decode()
-                response.append(string)
-                if line == b'SW42DA>':
-                    break
-            else:
-                break
-        ser.close()
-        return response
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No {PROMPT.decode()} prompt within {timeout}s")
+
+            # block for the first byte, then take whatever else has already arrived
+            ser.timeout = remaining
+            chunk = ser.read(1)
+            if not chunk:
+                continue
+            ser.timeout = 0
+            chunk += ser.read(4096)
+
+            # only rescan the tail in case the prompt straddles two chunks
+            start = max(0, len(buffer) - len(PROMPT) + 1)
+            buffer += chunk
+            end = buffer.find(PROMPT, start)
+            if end > -1:
+                return bytes(buffer[:end + len(PROMPT)])
+
+    @classmethod
+    def _split_response(cls, buffer: bytes) -> list[str]:
+        """Split a raw response into decoded lines, each keeps its line ending and the prompt is the last line."""
+        # only on "\n" like readline(), splitlines() would split on a lone "\r" as well
+        return [buffer[start:end].decode() for start, end in cls._line_spans(buffer)]
+
+    # every scalar value parse_result reads from the STATUS output
+    STATUS_KEYS = (
+        "Power",
+        "IR",
+        "IR_Mode",
+        "Key",
+        "Beep",
+        "LCD",
+        "LCD_PauseTime(S)",
+        "PWLED_Follow",
+        "Network",
+        "Baud",
+        "Temp(C)",
+        "Uptime(Day:Hour:Min:Sec)",
+        "ARC_Mode",
+        "OpticalSel",
+        "OpticalEn",
+        "OutMode",
+        "Audio",
+        "CEC_Control",
+        "CEC_ControlBy",
+        "CEC_Steps",
+        "MultiChannelOutFrom",
+        "2ChannelOutFrom",
+        "DRC",
+        "SurroundDecoder(Upmixer)",
+        "SpeakerVirtualizer",
+        "Telnet",
+        "TCP/IP Port",
+        "Mac",
+        "Local",
+    )
+
+    # the STATUS tables as (first header label, key in the parsed result)
+    STATUS_TABLES = (
+        ("Input", "Input"),
+        ("Output", "Output"),
+        ("AudioOut", "AudioOut"),
+        ("Line Output", "LineOutput"),
+        ("Dante Output", "DanteOutput"),
+        ("DHCP", "Network"),
+    )
 
     def parse_result(self, result: list[str]):
 
-        fw_version = self._get_same_line("FW Version:", result)
+        if self._parse_plan is not None:
+            status_dict = self._parse_with_plan(self._parse_plan, result)
+            if status_dict is not None:
+                return status_dict
+            _LOGGER.debug("STATUS layout has changed, rebuilding the parse plan")
+
+        index = self._status_index(result)
+
+        fw_version = self._get_same_line("FW Version:", result, index)
         status_dict: dict = {"FW Version":  fw_version}
 
-        values = [
-            "Power",
-            "IR",
-            "IR_Mode",
-            "Key",
-            "Beep",
-            "LCD",
-            "LCD_PauseTime(S)",
-            "PWLED_Follow",
-            "Network",
-            "Baud",
-            "Temp(C)",
-            "Uptime(Day:Hour:Min:Sec)",
-            "ARC_Mode",
-            "OpticalSel",
-            "OpticalEn",
-            "OutMode",
-            "Audio",
-            "CEC_Control",
-            "CEC_ControlBy",
-            "CEC_Steps",
-            "MultiChannelOutFrom",
-            "2ChannelOutFrom",
-            "DRC",
-            "SurroundDecoder(Upmixer)",
-            "SpeakerVirtualizer",
-            "Telnet",
-            "TCP/IP Port",
-            "Mac",
-            "Local",
-        ]
-
-        for v in values:
-            new_dict = self._get_single_key(v, result)
-            # print(new_dict)
-            status_dict = {**status_dict, **new_dict}
-
-        t = self._status_table("Input", result, "Input")
-        status_dict = {**status_dict, **t}
-
-        t = self._status_table("Output", result, "Output")
-        status_dict = {**status_dict, **t}
-
-        t = self._status_table("AudioOut", result, "AudioOut")
-        status_dict = {**status_dict, **t}
-
-        t = self._status_table("Line Output", result, "LineOutput")
-        status_dict = {**status_dict, **t}
-
-        t = self._status_table("Dante Output", result, "DanteOutput")
-        status_dict = {**status_dict, **t}
-
-        t = self._status_table("DHCP", result, "Network")
-        status_dict = {**status_dict, **t}
+        for v in self.STATUS_KEYS:
+            status_dict.update(self._get_single_key(v, result, index))
+
+        for key, dict_list_key in self.STATUS_TABLES:
+            status_dict.update(self._status_table(key, result, dict_list_key, index))
+
+        self._parse_plan = self._compile_plan(result, index, fw_version)
+
+        return self._select_network(status_dict)
+
+    def parse_status(self, buffer: bytes, fields: Collection[str] | None = None) -> dict:
+        """
+
+        Parse a raw STATUS response without decoding it line by line
+
+        Once a parse plan has been learnt the response is checked and read through a memoryview, only the
+        values of the requested fields are decoded.
+
+        fields: the parse_result keys wanted, e.g. {"Power", "AudioOut"}, all of them if None
+
+        returns: the parse_result dict, limited to fields when the plan could be used
+
+        """
 
+        plan = self._parse_plan
+        if plan is not None and buffer.isascii():
+            status_dict = self._parse_bytes_with_plan(plan, buffer, fields)
+            if status_dict is not None:
+                return status_dict
+
+        return self.parse_result(self._split_response(buffer))
+
+    @classmethod
+    def _parse_bytes_with_plan(cls, plan: ParsePlan, buffer: bytes, fields: Collection[str] | None) -> dict | None:
+        """The byte level version of _parse_with_plan, returns None when the response doesn't match the plan."""
+
+        spans = cls._line_spans(buffer)
+        line_count = len(spans)
+        view = memoryview(buffer)
+
+        for line_index, header in plan.encoded_headers:
+            if line_index >= line_count:
+                return None
+            start, end = spans[line_index]
+            if view[start:end] != header:
+                return None
+
+        status_dict: dict = {key: None for key in plan.order if fields is None or key in fields}
+        if "FW Version" in status_dict:
+            status_dict["FW Version"] = plan.fw_version
+
+        for value_line, layout, keys in plan.scalars:
+            wanted = [(key, value_pos) for key, value_pos in keys if key in status_dict]
+            if not wanted:
+                continue
+            if value_line >= line_count:
+                return None
+            start, end = spans[value_line]
+            values = cls._plan_values(view[start:end], layout, wanted)
+            if values is None:
+                return None
+            status_dict.update(values)
+
+        for dict_list_key, line_index, keys, layout, row_count in plan.tables:
+            if dict_list_key not in status_dict:
+                continue
+            end_line = line_index + row_count + 1
+            # the table must still have the same number of rows, followed by a blank line
+            if end_line > line_count or (end_line < line_count and buffer[slice(*spans[end_line])].strip()):
+                return None
+            rows = cls._plan_rows([view[start:end] for start, end in spans[line_index + 1:end_line]], keys, layout)
+            if rows is None:
+                return None
+            status_dict[dict_list_key] = rows
+
+        if status_dict.get("Network") is None:
+            status_dict.pop("Network", None)
+            return status_dict
+
+        return cls._select_network(status_dict)
+
+    @classmethod
+    def _plan_values(cls, line: memoryview | bytes, layout: tuple, wanted) -> dict | None:
+        """The wanted (key, column) values of a single key value row, None if it doesn't fit the plan."""
+        values = cls._row_values_bytes(memoryview(line), layout)
+        if values is None:
+            return None
+        status_dict = {}
+        for key, value_pos in wanted:
+            if value_pos >= len(values):
+                return None
+            value = cls._decode_value(values[value_pos])
+            if not value:
+                return None
+            if value.isdigit():
+                value = int(value)
+            status_dict[key] = value
+        return status_dict
+
+    @classmethod
+    def _plan_rows(cls, lines: list[memoryview | bytes], keys: list[str], layout: tuple) -> list[dict] | None:
+        """The rows of a table, None if they don't fit the plan."""
+        rows = []
+        for line in lines:
+            # every column of a wanted table is used, so decode the row in one go
+            values = cls._row_values(str(line, "ascii"), layout)
+            if len(values) < len(keys):
+                return None
+            rows.append({keys[i]: cls._table_value(values[i]) for i in range(len(keys))})
+        return rows
+
+    @staticmethod
+    def _line_spans(buffer: bytes) -> list[tuple[int, int]]:
+        """The (start, end) offset of each line in the buffer, including its line ending, to match _split_response."""
+        spans = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                if start < len(buffer):
+                    spans.append((start, len(buffer)))
+                return spans
+            spans.append((start, end + 1))
+            start = end + 1
+
+    @classmethod
+    def _row_values_bytes(cls, line: memoryview, layout: tuple) -> list | None:
+        """
+
+        Slice a value row held in a memoryview at its header's column offsets without copying it
+
+        returns: a memoryview per column, to be decoded with _decode_value only if used. If the row doesn't line
+        up with the header it is decoded and split on double spaces, giving str values. None for a blank row.
+
+        """
+
+        last_start, slices, gaps, _, spaces = layout
+
+        if last_start < len(line) and gaps(line)[:-1] == spaces:
+            return slices(line)[:-1]
+
+        values = cls._split_values(str(line, "ascii"))
+        return values or None
+
+    @staticmethod
+    def _decode_value(value: memoryview | str) -> str:
+        """
+
+        Decode a column from _row_values_bytes
+
+        returns: an empty string if the column is empty or holds two values, i.e. the row doesn't fit the plan
+
+        """
+        if not isinstance(value, str):
+            value = str(value, "ascii").strip()
+        if "  " in value:
+            return ""
+        return value
+
+    @staticmethod
+    def _select_network(status_dict: dict) -> dict:
         if status_dict["Network"][0]["DHCP"] == "On":
             network = {**status_dict["Network"][0]}
         else:
@@ -110,10 +399,230 @@ class Sw42daApi:
 
         return status_dict
 
+    @classmethod
+    def _compile_plan(cls, lines_to_check: list[str], index: dict, fw_version: str | None) -> ParsePlan:
+        """Record where each key and table was found so the next STATUS can be read without searching."""
+
+        headers = {}
+        if "FW Version:" in index:
+            fw_line = index["FW Version:"][0]
+            headers[fw_line] = lines_to_check[fw_line]
+
+        # the Power row's Network column is replaced by the Network table, don't hand it out as a value
+        tables_keys = {dict_list_key for _, dict_list_key in cls.STATUS_TABLES}
+        scalars = {}
+        for key in cls.STATUS_KEYS:
+            if key in tables_keys:
+                continue
+            line_index, value_pos, _ = index[key]
+            if line_index not in scalars:
+                headers[line_index] = lines_to_check[line_index]
+                layout = cls._column_layout(cls._header_columns(lines_to_check[line_index]))
+                scalars[line_index] = (line_index + 1, layout, [])
+            scalars[line_index][2].append((key, value_pos))
+
+        tables = []
+        for key, dict_list_key in cls.STATUS_TABLES:
+            line_index = index[key][0]
+            headers[line_index] = lines_to_check[line_index]
+            columns = cls._header_columns(lines_to_check[line_index])
+            row_count = 0
+            while (line_index + row_count + 1 < len(lines_to_check)
+                   and lines_to_check[line_index + row_count + 1].strip()):
+                row_count += 1
+            tables.append((
+                dict_list_key, line_index, [label for _, label in columns], cls._column_layout(columns), row_count
+            ))
+
+        return ParsePlan(
+            fw_version=fw_version,
+            headers=tuple(sorted(headers.items())),
+            encoded_headers=tuple((line_index, header.encode()) for line_index, header in sorted(headers.items())),
+            scalars=tuple((value_line, layout, tuple(keys)) for value_line, layout, keys in scalars.values()),
+            tables=tuple(tables),
+            order=tuple(dict.fromkeys(
+                ("FW Version", *cls.STATUS_KEYS, *(dict_list_key for _, dict_list_key in cls.STATUS_TABLES))
+            )),
+        )
+
+    @classmethod
+    def _parse_with_plan(cls, plan: ParsePlan, lines_to_check: list[str]) -> dict | None:
+        """
+
+        Read a STATUS response straight from the line numbers and column offsets in the plan
+
+        returns: None when the response doesn't match the plan's layout (e.g. after a firmware upgrade)
+
+        """
+
+        line_count = len(lines_to_check)
+
+        for line_index, header in plan.headers:
+            if line_index >= line_count or lines_to_check[line_index] != header:
+                return None
+
+        status_dict: dict = dict.fromkeys(plan.order)
+        status_dict["FW Version"] = plan.fw_version
+
+        for value_line, layout, keys in plan.scalars:
+            if value_line >= line_count:
+                return None
+            values = cls._row_values(lines_to_check[value_line], layout)
+            for key, value_pos in keys:
+                value = values[value_pos]
+                if value.isdigit():
+                    value = int(value)
+                status_dict[key] = value
+
+        for dict_list_key, line_index, keys, layout, row_count in plan.tables:
+            end = line_index + row_count + 1
+            # the table must still have the same number of rows, followed by a blank line
+            if end > line_count or (end < line_count and lines_to_check[end].strip()):
+                return None
+            rows = []
+            for line in lines_to_check[line_index + 1:end]:
+                if not line.strip():
+                    return None
+                values = cls._row_values(line, layout)
+                rows.append({keys[i]: cls._table_value(values[i]) for i in range(len(keys))})
+            status_dict[dict_list_key] = rows
+
+        return cls._select_network(status_dict)
+
+    @classmethod
+    def _status_index(cls, lines_to_check: list[str]) -> dict[str, tuple[int, int, list[str] | None]]:
+        """
+
+        Tokenize the STATUS output once, mapping each header label to its line, column and value row
+
+        Value rows are stepped over so a value can never be mistaken for a header. Tables only record
+        their header line, their rows are read by _status_table.
+
+        returns: {"FW Version:": (3, 0, None), "Power": (5, 0, ["On", "On", ...]), "IR": (5, 1, [...]), ...}
+
+        """
+
+        scalar_keys = frozenset(cls.STATUS_KEYS)
+        table_keys = frozenset(key for key, _ in cls.STATUS_TABLES)
+
+        index: dict[str, tuple[int, int, list[str] | None]] = {}
+        line_index = 0
+        line_count = len(lines_to_check)
+
+        while line_index < line_count:
+
+            line = lines_to_check[line_index]
+
+            if line.lstrip().startswith("FW Version:"):
+                index.setdefault("FW Version:", (line_index, 0, None))
+                line_index += 1
+                continue
+
+            labels = cls._split_values(line)
+
+            if labels and labels[0] in table_keys:
+                index.setdefault(labels[0], (line_index, 0, None))
+                # the rows run until a blank line
+                line_index += 1
+                while line_index < line_count and lines_to_check[line_index].strip():
+                    line_index += 1
+                continue
+
+            if not scalar_keys.intersection(labels):
+                line_index += 1
+                continue
+
+            # a header's values are on the next line
+            values = None
+            if line_index + 1 < line_count:
+                layout = cls._column_layout(cls._header_columns(line))
+                values = cls._row_values(lines_to_check[line_index + 1], layout)
+
+            for value_pos, label in enumerate(labels):
+                if label in scalar_keys:
+                    index.setdefault(label, (line_index, value_pos, values))
+
+            line_index += 2
+
+        return index
+
+    @staticmethod
+    def _header_columns(line: str) -> list[tuple[int, str]]:
+        """
+
+        The start offset and label of each column in a fixed width header row
+
+        Labels are separated by two or more spaces as some labels contain a space.
+
+        returns: [(0, "Line Output"), (24, "Volume"), (35, "Mute"), ...]
+
+        """
+        return [(match.start(), match.group()) for match in _COLUMN.finditer(line)]
+
+    @staticmethod
+    def _split_values(line: str) -> list[str]:
+        split_values = line.split("  ")# NB two spaces as some values contain a space
+        return [v.strip() for v in split_values if v.strip()]
+
+    @staticmethod
+    def _column_layout(columns: list[tuple[int, str]]) -> tuple:
+        """
+
+        Work out once per header how its value rows are sliced, see _row_values
+
+        returns: (start of the last column, getter for every column's slice, getter for the character before
+        each column after the first, the spaces those characters must be, the same as bytes values)
+
+        """
+
+        starts = [start for start, _ in columns]
+        ends = starts[1:] + [None]
+        edges = [start - 1 for start in starts[1:]]
+
+        # itemgetter returns a bare value rather than a tuple when given a single item
+        slices = itemgetter(*[slice(start, end) for start, end in zip(starts, ends)], slice(0, 0))
+        gaps = itemgetter(*edges, 0)
+
+        return starts[-1], slices, gaps, (" ",) * len(edges), (ord(" "),) * len(edges)
+
+    @classmethod
+    def _row_values(cls, line: str, layout: tuple, fixed_width: bool = True) -> list[str]:
+        """
+
+        Slice a value row at its header's column offsets
+
+        The firmware prints fixed width tables, so slicing also copes with a value that fills its column and
+        is only followed by a single space. If the row doesn't line up with the header (a value running across a
+        column start or an extra value after the last column) the row is split on double spaces instead.
+
+        """
+
+        if not fixed_width:
+            return cls._split_values(line)
+
+        last_start, slices, gaps, spaces, _ = layout
+
+        # every column after the first must start just after a space
+        if last_start >= len(line) or gaps(line)[:-1] != spaces:
+            return cls._split_values(line)
+
+        values = [value.strip() for value in slices(line)[:-1]]
+
+        # an empty column or an extra value after the last column
+        if not all(values) or "  " in values[-1]:
+            return cls._split_values(line)
+
+        return values
+
     @staticmethod
-    def _get_same_line(key_to_find: str, lines_to_check: list[str]):
+    def _get_same_line(key_to_find: str, lines_to_check: list[str], index: dict | None = None):
         key_to_find = key_to_find.strip() + " "
         # print("Looking for", key_to_find)
+        if index is not None:
+            if key_to_find.strip() not in index:
+                return None
+            line_index, _, _ = index[key_to_find.strip()]
+            return (lines_to_check[line_index].strip() + " ").replace(key_to_find, "").strip()
         for line in lines_to_check:
             line = line.strip() + " "
             # print(line)
@@ -121,12 +630,21 @@ class Sw42daApi:
                 return line.replace(key_to_find, "").strip()
         return None
 
-    @staticmethod
-    def _get_single_key(key_to_find: str, lines_to_check: list[str]):
+    @classmethod
+    def _get_single_key(
+            cls,
+            key_to_find: str,
+            lines_to_check: list[str],
+            index: dict | None = None,
+            fixed_width: bool = True
+    ):
         """
 
         Get a *single* key and value from the "key_to_find"
 
+        index: from _status_index, the value is taken from the already tokenized row instead of searching
+        fixed_width: slice the value row at the header's column offsets, otherwise split it on double spaces
+
         returns: {"Power": "On"}
 
         example:
@@ -145,46 +663,58 @@ class Sw42daApi:
 
         """
 
-        line_index = 0
         key_to_find = key_to_find.strip() + " "
 
-        for line in lines_to_check:
+        if index is not None:
+            if key_to_find.strip() not in index:
+                return None
+            line_index, value_pos, values = index[key_to_find.strip()]
 
+        else:
             # remove any unnecessary whitespace and then add a space to end of line so we can match the exact key
             # e.g. match "Audio " in "AudioNot, NotAudio, Audio "
-            line = line.strip() + " "
-            # print(line)
+            line_index = next(
+                (i for i, line in enumerate(lines_to_check) if (line.strip() + " ").find(key_to_find) > -1),
+                None
+            )
 
-            if line.find(key_to_find) > -1:
-                split_keys = line.split("  ")# NB two spaces as some values contain a space
-                keys = [s.strip() + " " for s in split_keys if s.strip()]
-                # print(keys)
+            if line_index is None:
+                return None
 
-                value_pos = keys.index(key_to_find)
-                # print("Value is on line", line_index+1, "at position", value_pos)
+            columns = cls._header_columns(lines_to_check[line_index])
+            keys = [label + " " for _, label in columns]
+            # print(keys)
 
-                split_values = lines_to_check[line_index + 1].split("  ")# NB two spaces as some values contain a space
-                values = [v.strip() for v in split_values if v.strip()]
+            value_pos = keys.index(key_to_find)
+            # print("Value is on line", line_index+1, "at position", value_pos)
 
-                # print(key_to_find, values[value_pos])
-                value = values[value_pos]
+            values = cls._row_values(lines_to_check[line_index + 1], cls._column_layout(columns), fixed_width)
 
-                if value.isdigit():
-                    value = int(value)
+        # print(key_to_find, values[value_pos])
+        value = values[value_pos]
 
-                return {key_to_find.strip(): value}
+        if value.isdigit():
+            value = int(value)
 
-            line_index += 1
+        return {key_to_find.strip(): value}
 
-        return None
-
-    @staticmethod
-    def _status_table(key_to_find: str, lines_to_check: list[str], dict_list_key: str):
+    @classmethod
+    def _status_table(
+            cls,
+            key_to_find: str,
+            lines_to_check: list[str],
+            dict_list_key: str,
+            index: dict | None = None,
+            fixed_width: bool = True
+    ):
 
         """
 
         Gets an entire table
 
+        index: from _status_index, jumps straight to the header line instead of searching for it
+        fixed_width: slice each row at the header's column offsets, otherwise split them on double spaces
+
         returns: LineOutputs: [{}]
 
         example:
@@ -202,65 +732,196 @@ class Sw42daApi:
         """
 
         return_list = []
-        line_index = 0
-
-        for line in lines_to_check:
+        key_to_find = key_to_find.strip() + " "
 
+        if index is not None:
+            if key_to_find.strip() not in index:
+                return None
+            line_index, _, _ = index[key_to_find.strip()]
+        else:
             # remove any unnecessary whitespace and then add a space to end of line so we can match the exact key
             # e.g. match "Audio " in "AudioNot, NotAudio, Audio "
-            line = line.strip() + " "
-            key_to_find = key_to_find.strip() + " "
-
             # make sure value is at pos 0
-            if line.find(key_to_find) == 0:
-                split_keys = line.split("  ")# NB two spaces as some values contain a space
+            line_index = next(
+                (i for i, line in enumerate(lines_to_check) if (line.strip() + " ").find(key_to_find) == 0),
+                None
+            )
 
-                # store the key labels
-                keys = [s.strip() + " " for s in split_keys if s.strip()]
+        if line_index is None:
+            return None
 
-                # print("keys", keys)
+        # store the key labels and where each column starts
+        columns = cls._header_columns(lines_to_check[line_index])
+        keys = [label for _, label in columns]
+        layout = cls._column_layout(columns)
 
-                # value_pos = keys.index(key_to_find)
-                # print("Table value is on line", line_index+1, "at position", value_pos)
+        # print("keys", keys)
 
-                # iterate through the lines until come to a blank line, add dicts to the list
+        # iterate through the lines until come to a blank line, add dicts to the list
 
-                # the values are on the next line, after the key labels
-                split_values = lines_to_check[line_index + 1].split("  ")# NB two spaces as some values contain a space
-                values = [v.strip() for v in split_values if v.strip()]
+        # the values are on the next line, after the key labels
+        line_index += 1
 
-                while values:
+        while line_index < len(lines_to_check) and lines_to_check[line_index].strip():
 
-                    # print("values", values)
+            values = cls._row_values(lines_to_check[line_index], layout, fixed_width)
 
-                    line_dict = {}
+            # print("values", values)
 
-                    for i in range(len(keys)):
+            line_dict = {}
 
-                        value = values[i].strip()
+            for i in range(len(keys)):
+                line_dict[keys[i]] = cls._table_value(values[i])
 
-                        if value.isdigit():
-                            value = int(value)
-                        else:
-                            # check if an ip address
-                            ip_parts = value.split(".")
-                            if len(ip_parts)==4:
-                                ip = []
-                                for part in ip_parts:
-                                    ip.append(str(int(part.replace(")",""))))
-                                value = (".".join(ip))
+            return_list.append(line_dict)
 
-                        line_dict[keys[i].strip()] = value
+            line_index += 1
 
-                    return_list.append(line_dict)
+        # print("return_list", return_list)
+        return {dict_list_key: return_list}
 
-                    line_index += 1
-                    split_values = lines_to_check[line_index + 1].split("  ")# NB two spaces as some values contain a space
-                    values = [v.strip() for v in split_values if v.strip()]
+    @staticmethod
+    def _table_value(value: str):
+
+        if value.isdigit():
+            value = int(value)
+        else:
+            # check if an ip address
+            ip_parts = value.split(".")
+            if len(ip_parts)==4:
+                ip = []
+                for part in ip_parts:
+                    ip.append(str(int(part.replace(")",""))))
+                value = (".".join(ip))
+
+        return value
+
+
+class StatusStreamParser:
+    """
+
+    Parses a STATUS response line by line while it is still arriving
+
+    With a parse plan each block or table is returned by feed() as soon as its last line arrives. Without a
+    plan, or once the response stops matching it, the lines are only collected and finish() parses them in
+    one go with parse_result, which learns the plan for the next poll.
+
+    """
+
+    def __init__(self, api: Sw42daApi, fields: Collection[str] | None = None):
+        self._api = api
+        self._plan = api._parse_plan
+        self._fields = fields
+        self._lines: list[bytes] = []
+        self._result: dict = {}
+        self._completed = 0
+
+        # line number: bytes the line must be, and line number: (section name, method, arguments)
+        self._headers: dict[int, bytes] = {}
+        self._sections: dict[int, tuple] = {}
+        self._fw_line = 0
+
+        if self._plan is not None:
+            self._headers = dict(self._plan.encoded_headers)
+            if self._plan.encoded_headers:
+                self._fw_line = self._plan.encoded_headers[0][0]
+            for value_line, layout, keys in self._plan.scalars:
+                wanted = tuple((key, value_pos) for key, value_pos in keys if fields is None or key in fields)
+                if wanted:
+                    self._sections[value_line] = (keys[0][0], self._scalar_section, (layout, wanted))
+            for dict_list_key, line_index, keys, layout, row_count in self._plan.tables:
+                if fields is None or dict_list_key in fields:
+                    # a table is complete at the blank line after its rows
+                    self._sections[line_index + row_count + 1] = (
+                        dict_list_key, self._table_section, (dict_list_key, line_index, keys, layout)
+                    )
+
+    @property
+    def streaming(self) -> bool:
+        """Whether the response still matches the plan, i.e. sections are being returned as they arrive."""
+        return self._plan is not None
+
+    @property
+    def complete(self) -> bool:
+        """Whether every wanted section has been read, the rest of the response is then only collected."""
+        return self._completed > 0 and self._completed == len(self._sections)
+
+    def feed(self, line: bytes) -> list[tuple[str, dict]]:
+        """
 
-                # print("return_list", return_list)
-                return {dict_list_key: return_list}
+        Add the next line of the response, with its line ending
 
-            line_index += 1
+        returns: [(section name, {parse_result key: value, ...})] for each section this line completed
+
+        """
+
+        line_index = len(self._lines)
+        self._lines.append(line)
+
+        if self._plan is None or self.complete:
+            return []
+
+        # the column offsets were learnt from decoded text, they only hold for ASCII, as in parse_status
+        if not line.isascii():
+            return self._lost_plan(line_index)
+
+        header = self._headers.get(line_index)
+        if header is not None and line != header:
+            return self._lost_plan(line_index)
+
+        sections = []
+
+        if line_index == self._fw_line and self._wanted("FW Version"):
+            self._result["FW Version"] = self._plan.fw_version
+            sections.append(("FW Version", {"FW Version": self._plan.fw_version}))
+
+        if line_index in self._sections:
+            name, method, args = self._sections[line_index]
+            values = method(line, *args)
+            if values is None:
+                return self._lost_plan(line_index)
+            self._result.update(values)
+            self._completed += 1
+            sections.append((name, values))
+
+        return sections
+
+    def finish(self) -> dict:
+        """
+
+        The parsed response, once the prompt has arrived
+
+        returns: the parse_result dict, limited to fields if the whole response matched the plan
+
+        raises ValueError if the response can't be parsed
+
+        """
 
-        return None
\ No newline at end of file
+        if self._plan is not None and self._completed == len(self._sections):
+            return {key: self._result[key] for key in self._plan.order if key in self._result}
+
+        try:
+            return self._api.parse_result(self._api._split_response(b"".join(self._lines)))
+        except (LookupError, TypeError, ValueError) as err:
+            raise ValueError(f"Malformed STATUS response: {err!r}") from err
+
+    def _wanted(self, key: str) -> bool:
+        return self._fields is None or key in self._fields
+
+    def _lost_plan(self, line_index: int) -> list:
+        _LOGGER.debug("STATUS line %s doesn't match the parse plan, parsing the whole response", line_index)
+        self._plan = None
+        return []
+
+    def _scalar_section(self, line: bytes, layout: tuple, wanted) -> dict | None:
+        return self._api._plan_values(line, layout, wanted)
+
+    def _table_section(self, line: bytes, dict_list_key: str, line_index: int, keys: list[str], layout: tuple):
+        if line.strip():
+            return None
+        rows = self._api._plan_rows(self._lines[line_index + 1:-1], keys, layout)
+        if rows is None:
+            return None
+        if dict_list_key == "Network":
+            return self._api._select_network({"Network": rows})
+        return {dict_list_key: rows}
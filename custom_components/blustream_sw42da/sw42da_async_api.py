@@ -0,0 +1,622 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Coroutine, Iterable
+from contextlib import asynccontextmanager
+
+from .sw42da_api import Sw42daApi, StatusStreamParser, PROMPT, COMMAND_TIMEOUT, BANNER_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5
+
+# the probe gives up on a host quickly, an SW42DA on the LAN answers within a few hundred ms
+PROBE_CONNECT_TIMEOUT = 1.0
+PROBE_TIMEOUT = 2.0
+
+# hosts probed at once by async_discover
+DISCOVERY_CONCURRENCY = 64
+
+# lower goes first, user actions jump ahead of the periodic STATUS poll
+PRIORITY_USER = 0
+PRIORITY_POLL = 1
+# listening for what the device sends unprompted, only while nothing else wants the session
+PRIORITY_IDLE = 2
+
+
+class CommandQueue:
+    """
+
+    Serializes the commands sent over one telnet session
+
+    Waiting commands go in priority order, then in the order they arrived. Keeps the queue depth and the
+    time spent waiting for metrics(), PRIORITY_IDLE slots aren't counted.
+
+    """
+
+    def __init__(self):
+        self._busy = False
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrival = itertools.count()
+        self._queued = asyncio.Event()
+
+        self.max_depth = 0
+        self.commands = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        """The commands waiting plus the one being sent."""
+        return len(self._waiters) + self._busy
+
+    def metrics(self) -> dict[str, float | int]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "commands": self.commands,
+            "last_wait": self.last_wait,
+            "max_wait": self.max_wait,
+            "average_wait": self.total_wait / self.commands if self.commands else 0.0,
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for the session, it is held until the block is left."""
+        start = time.monotonic()
+        if self._busy or self._waiters:
+            waiter = (priority, next(self._arrival), asyncio.get_running_loop().create_future())
+            heapq.heappush(self._waiters, waiter)
+            self._queued.set()
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                await waiter[2]
+            except BaseException:
+                if waiter[2].done() and not waiter[2].cancelled():
+                    # the session was handed over just as the wait was cancelled
+                    self._release()
+                else:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                raise
+        else:
+            self._busy = True
+            self.max_depth = max(self.max_depth, 1)
+
+        if priority < PRIORITY_IDLE:
+            wait = time.monotonic() - start
+            self.commands += 1
+            self.total_wait += wait
+            self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def async_wait_queued(self) -> None:
+        """Wait until something is waiting for the session."""
+        while not self._waiters:
+            self._queued.clear()
+            await self._queued.wait()
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # hand the session straight to the next command, it stays busy
+                future.set_result(None)
+                return
+        self._busy = False
+
+
+class Sw42daAsyncApi(Sw42daApi):
+    """Asyncio streams client for the SW42DA, no executor thread is held while waiting on the device."""
+
+    def __init__(
+            self,
+            host_ip: str,
+            host_port: int,
+            baud_rate: int
+    ):
+        super().__init__(host_ip, host_port, baud_rate)
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self.queue = CommandQueue()
+
+        # called with what the device sends unprompted ahead of a response, dropped if None
+        self.on_unsolicited: Callable[[bytes], None] | None = None
+        # whether any of the response to the command being sent has arrived, it is then never sent again
+        self._received = False
+
+    async def _async_connection(
+            self,
+            connect_timeout: float = CONNECT_TIMEOUT
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Return the open stream, connecting first if needed, and whether it was reused."""
+        if self._writer is not None and not self._writer.is_closing():
+            self.reuse_count += 1
+            return self._reader, self._writer, True
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port), connect_timeout
+        )
+        self.connect_count += 1
+        _LOGGER.debug("Connected to %s (connects: %s, reuses: %s)", self._url, self.connect_count, self.reuse_count)
+        try:
+            # swallow the login banner so its prompt is not taken as the end of the first response
+            await self._async_read_until_prompt(self._reader, BANNER_TIMEOUT)
+        except TimeoutError:
+            pass
+        return self._reader, self._writer, False
+
+    async def _async_disconnect(self):
+        if self._writer is not None:
+            writer = self._writer
+            self._reader = None
+            self._writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError as err:
+                _LOGGER.debug("Error closing connection to %s: %s", self._url, err)
+
+    async def async_close(self):
+        """Close the telnet session, the next command will reconnect."""
+        async with self.queue.slot(PRIORITY_USER):
+            await self._async_disconnect()
+        _LOGGER.debug("Closed %s (connects: %s, reuses: %s)", self._url, self.connect_count, self.reuse_count)
+
+    async def async_read_unsolicited(self) -> bytes:
+        """
+
+        Hold the session while no command wants it and read what the device sends without being asked
+
+        returns: the bytes that arrived, b"" if a command started waiting for the session first
+
+        raises OSError if the session can't be opened or has dropped
+
+        """
+
+        async with self.queue.slot(PRIORITY_IDLE):
+            reader, _, _ = await self._async_connection()
+            # a cancelled read leaves what has arrived in the buffer for the next command to read
+            read = asyncio.ensure_future(reader.read(4096))
+            queued = asyncio.ensure_future(self.queue.async_wait_queued())
+            try:
+                await asyncio.wait((read, queued), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                queued.cancel()
+                if not read.done():
+                    read.cancel()
+                    # the read may still complete instead, its bytes mustn't be lost
+                    await asyncio.wait((read,))
+            if read.cancelled():
+                return b""
+            try:
+                chunk = read.result()
+                if not chunk:
+                    raise ConnectionResetError("socket disconnected")
+            except OSError:
+                await self._async_disconnect()
+                raise
+            return chunk
+
+    async def async_send_command(self, c: str, priority: int = PRIORITY_USER) -> list[str]:
+        return self._split_response(await self.async_send_raw(c, priority))
+
+    async def async_send_raw(self, c: str, priority: int = PRIORITY_USER) -> bytes:
+        """Send a command and return the undecoded response, ending with the prompt."""
+        return await self._async_request(c, self._async_exchange, priority)
+
+    async def async_send_commands(self, commands: list[str], priority: int = PRIORITY_USER) -> list[list[str]]:
+        """
+
+        Send a batch of commands back to back, then read their responses
+
+        The responses are told apart by their SW42DA> prompts, so the batch takes about one round trip.
+
+        returns: the response lines of each command, in the order of commands
+
+        """
+
+        return [response for response, _ in await self.async_send_batch(commands, priority)]
+
+    async def async_send_batch(
+            self,
+            commands: list[str],
+            priority: int = PRIORITY_USER
+    ) -> list[tuple[list[str], float]]:
+        """
+
+        async_send_commands, with the time each response took
+
+        returns: [(response lines, seconds from sending the batch to the command's prompt), ...]
+
+        """
+
+        if not commands:
+            return []
+        lines = [c if c.endswith("\n") else c + "\n" for c in commands]
+
+        async def exchange(
+                reader: asyncio.StreamReader, writer: asyncio.StreamWriter, b: bytes
+        ) -> list[tuple[list[str], float]]:
+            start = time.monotonic()
+            writer.write(b)
+            await writer.drain()
+            responses = []
+            for line in lines:
+                response = self._split_response(await self._async_read_response(reader, line, COMMAND_TIMEOUT))
+                responses.append((response, time.monotonic() - start))
+            return responses
+
+        # some of the commands may have run before the session dropped, a batch is never sent again
+        return await self._async_request("".join(lines), exchange, priority, resend=False)
+
+    async def _async_request(
+            self,
+            c: str,
+            exchange: Callable[..., Awaitable],
+            priority: int,
+            connect_timeout: float = CONNECT_TIMEOUT,
+            resend: bool = True
+    ):
+        """
+
+        Run exchange(reader, writer, command bytes) on the session
+
+        If a reused session turns out to have been dropped before any of the response arrived, it is reopened
+        and the command sent once more, unless resend is False.
+
+        """
+
+        if not c.endswith("\n"):
+            c = c + "\n"
+        b = bytes(c, "UTF-8")
+        async with self.queue.slot(priority):
+            reader, writer, reused = await self._async_connection(connect_timeout)
+            try:
+                # anything left over from an earlier command isn't this one's response, as in Sw42daApi._exchange
+                self._unsolicited(await self._async_take_buffered(reader))
+                self._received = False
+                return await exchange(reader, writer, b)
+            except ConnectionError as err:
+                await self._async_disconnect()
+                if not reused or not resend or self._received:
+                    raise
+                # the device dropped the idle session, reconnect and try once more
+                _LOGGER.debug("Connection to %s dropped (%s), reconnecting", self._url, err)
+                reader, writer, _ = await self._async_connection(connect_timeout)
+                try:
+                    return await exchange(reader, writer, b)
+                except OSError:
+                    await self._async_disconnect()
+                    raise
+            except BaseException:
+                # never resend after a timeout, the device may have run the command already.
+                # the rest of the response may still arrive, don't leave it to be read as the next response
+                await self._async_disconnect()
+                raise
+
+    async def async_status(self, fields: Collection[str] | None = None, priority: int = PRIORITY_POLL) -> dict:
+        """Fetch and parse STATUS, only decoding fields (parse_result keys) if given, see parse_status."""
+        return self.parse_status(await self.async_send_raw("STATUS", priority), fields)
+
+    async def async_probe(self) -> dict:
+        """
+
+        Check quickly that the host is an SW42DA
+
+        Connects with PROBE_CONNECT_TIMEOUT and reads STATUS within PROBE_TIMEOUT. The response must end with
+        the SW42DA> prompt and carry a firmware version and MAC.
+
+        returns: the parse_result dict, the session is left open for the next command
+
+        raises OSError, TimeoutError included, if the host doesn't answer in time and ValueError if what
+        answers isn't an SW42DA
+
+        """
+
+        async def exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, b: bytes) -> bytes:
+            writer.write(b)
+            await writer.drain()
+            return await self._async_read_response(reader, b, PROBE_TIMEOUT)
+
+        buffer = await self._async_request("STATUS", exchange, PRIORITY_USER, PROBE_CONNECT_TIMEOUT)
+        if b"FW Version" not in buffer or b"Mac" not in buffer:
+            raise ValueError(f"{self._url} answered with a {PROMPT.decode()} prompt but isn't an SW42DA")
+        try:
+            result = self.parse_status(buffer)
+        except (LookupError, TypeError, ValueError) as err:
+            raise ValueError(f"Unexpected STATUS from {self._url}: {err!r}") from err
+        if not result.get("FW Version") or not result.get("Mac"):
+            raise ValueError(f"{self._url} didn't report its firmware version and MAC")
+        return result
+
+    async def async_status_stream(
+            self,
+            fields: Collection[str] | None = None,
+            on_section: Callable[[str, dict], None] | None = None,
+            priority: int = PRIORITY_POLL,
+    ) -> dict:
+        """
+
+        Fetch STATUS, parsing each line as it arrives instead of waiting for the prompt
+
+        fields: the parse_result keys wanted, all of them if None
+        on_section: called with (section name, {key: value, ...}) as each block or table is complete, only
+            while the response matches the parse plan learnt from an earlier STATUS
+        priority: where it goes in the command queue, behind user commands by default
+
+        returns: the same dict as async_status
+
+        raises ValueError if the response can't be parsed
+
+        """
+
+        async def exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, b: bytes) -> dict:
+            parser = StatusStreamParser(self, fields)
+            writer.write(b)
+            await writer.drain()
+            async for line in self._async_iter_response(reader, b, COMMAND_TIMEOUT):
+                for section in parser.feed(line):
+                    if on_section is not None:
+                        on_section(*section)
+            return parser.finish()
+
+        return await self._async_request("STATUS", exchange, priority)
+
+    async def _async_iter_lines(self, reader: asyncio.StreamReader, timeout: float) -> AsyncIterator[bytes]:
+        """
+
+        Yield the response line by line, with line endings, as the chunks arrive, ending with the prompt line
+
+        raises TimeoutError if the prompt hasn't arrived within timeout seconds
+
+        """
+
+        deadline = time.monotonic() + timeout
+        pending = b""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No {PROMPT.decode()} prompt within {timeout}s")
+            try:
+                chunk = await asyncio.wait_for(reader.read(4096), remaining)
+            except asyncio.TimeoutError as err:
+                raise TimeoutError(f"No {PROMPT.decode()} prompt within {timeout}s") from err
+            if not chunk:
+                raise ConnectionResetError("socket disconnected")
+            self._received = True
+
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                yield line + b"\n"
+
+            # the prompt has no line ending, it is always the last thing the device sends
+            if pending.endswith(PROMPT):
+                yield pending
+                return
+
+    async def _async_iter_response(
+            self,
+            reader: asyncio.StreamReader,
+            command: bytes,
+            timeout: float
+    ) -> AsyncIterator[bytes]:
+        """_async_iter_lines from the device's echo of command on, see _async_read_response."""
+        deadline = time.monotonic() + timeout
+        echo = command.strip()
+        while True:
+            skipped = []
+            try:
+                async for line in self._async_iter_lines(reader, deadline - time.monotonic()):
+                    if skipped is not None:
+                        # the prompt after an unprompted message can share the echo's line
+                        before, prompt, rest = line.rpartition(PROMPT)
+                        if rest.strip() != echo:
+                            skipped.append(line)
+                            continue
+                        skipped.append(before + prompt)
+                        self._unsolicited(b"".join(skipped))
+                        skipped = None
+                        line = rest
+                    yield line
+            except TimeoutError as err:
+                raise TimeoutError(f"No response to {echo.decode()} within {timeout}s") from err
+            if skipped is None:
+                return
+            self._unsolicited(b"".join(skipped))
+
+    async def _async_exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, b: bytes) -> bytes:
+        writer.write(b)
+        await writer.drain()
+        return await self._async_read_response(reader, b, COMMAND_TIMEOUT)
+
+    async def _async_read_response(self, reader: asyncio.StreamReader, command: bytes, timeout: float) -> bytes:
+        """
+
+        Read the response to command, from the device's echo of it to the SW42DA> prompt
+
+        Anything the device sent unprompted before the echo, e.g. a change made on the front panel, is passed
+        to on_unsolicited, along with its prompt.
+
+        raises TimeoutError if the response hasn't arrived within timeout seconds
+
+        """
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                buffer = await self._async_read_until_prompt(reader, deadline - time.monotonic())
+            except TimeoutError as err:
+                raise TimeoutError(f"No response to {command.strip().decode()} within {timeout}s") from err
+            start = self._echo_offset(buffer, command)
+            if start is None:
+                self._unsolicited(buffer)
+                continue
+            if start:
+                self._unsolicited(buffer[:start])
+            return buffer[start:]
+
+    @staticmethod
+    def _echo_offset(buffer: bytes, command: bytes) -> int | None:
+        """Where the line echoing command starts in buffer, None if there is no such line."""
+        echo = command.strip()
+        start = 0
+        while start < len(buffer):
+            end = buffer.find(b"\n", start)
+            end = len(buffer) if end == -1 else end + 1
+            if buffer[start:end].strip() == echo:
+                return start
+            start = end
+        return None
+
+    @staticmethod
+    async def _async_take_buffered(reader: asyncio.StreamReader) -> bytes:
+        """What has already arrived, without waiting for more, StreamReader has no public way to ask for it."""
+        # read() returns at once when data is buffered, and resumes the transport unlike clearing _buffer
+        size = len(reader._buffer)
+        return await reader.read(size) if size else b""
+
+    def _unsolicited(self, data: bytes) -> None:
+        if not data:
+            return
+        if self.on_unsolicited is not None:
+            self.on_unsolicited(data)
+        else:
+            _LOGGER.debug("Dropping %r, sent by %s unprompted", data, self._url)
+
+    async def _async_read_until_prompt(self, reader: asyncio.StreamReader, timeout: float) -> bytes:
+        """
+        Read until the SW42DA> prompt arrives.
+
+        raises TimeoutError if the prompt hasn't arrived within timeout seconds
+        """
+        try:
+            buffer = await asyncio.wait_for(reader.readuntil(PROMPT), timeout)
+        except asyncio.TimeoutError as err:
+            raise TimeoutError(f"No {PROMPT.decode()} prompt within {timeout}s") from err
+        except asyncio.IncompleteReadError as err:
+            self._received = self._received or bool(err.partial)
+            raise ConnectionResetError("socket disconnected") from err
+        self._received = True
+        return buffer
+
+
+class Sw42daPushListener:
+    """
+
+    Passes on what the device sends without being asked, read from the command session between commands
+
+    on_line is called with each line, e.g. a change made on the front panel, by IR or over CEC. The session
+    is only listened to while no command is queued, a message that arrives ahead of a command's response is
+    passed on by the api, see Sw42daAsyncApi.on_unsolicited. The session is reopened with a growing delay if
+    it drops.
+
+    """
+
+    RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 60
+
+    def __init__(self, api: Sw42daAsyncApi, on_line: Callable[[str], None]):
+        self._api = api
+        self._on_line = on_line
+        self._task: asyncio.Task | None = None
+        self._pending = b""
+        self.connected = False
+
+    def start(self, create_task: Callable[[Coroutine], asyncio.Task] | None = None):
+        """Start listening, in a task made by create_task if given, e.g. to have it tracked by its owner."""
+        if self._task is None or self._task.done():
+            self._api.on_unsolicited = self._feed
+            create_task = create_task or asyncio.get_running_loop().create_task
+            self._task = create_task(self._async_run())
+
+    async def async_stop(self):
+        if self._api.on_unsolicited == self._feed:
+            self._api.on_unsolicited = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _async_run(self):
+        delay = self.RETRY_DELAY
+        while True:
+            try:
+                chunk = await self._api.async_read_unsolicited()
+            except OSError as err:
+                self.connected = False
+                self._pending = b""
+                _LOGGER.debug("Listener on %s dropped: %r", self._api._url, err)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+            self.connected = True
+            delay = self.RETRY_DELAY
+            self._feed(chunk)
+
+    def _feed(self, chunk: bytes) -> None:
+        *lines, self._pending = (self._pending + chunk).split(b"\n")
+        # the prompt after a message isn't part of the next one
+        if self._pending.endswith(PROMPT):
+            self._pending = self._pending[:-len(PROMPT)]
+        for line in lines:
+            text = line.decode("UTF-8", errors="replace").rpartition(PROMPT.decode())[2].strip()
+            if not text:
+                continue
+            try:
+                self._on_line(text)
+            except Exception:
+                # one message that can't be handled mustn't stop the listener
+                _LOGGER.exception("Error handling %r from %s", text, self._api._url)
+
+
+async def async_discover(
+        hosts: Iterable[str],
+        port: int,
+        baud_rate: int,
+        concurrency: int = DISCOVERY_CONCURRENCY
+) -> list[dict]:
+    """
+
+    Probe hosts concurrently for SW42DAs, at most concurrency at a time
+
+    returns: [{"host": ..., "port": ..., "mac": ..., "local": ..., "fw_version": ...}, ...] for each unit that
+        answered, in the order of hosts
+
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: str) -> dict | None:
+        async with semaphore:
+            api = Sw42daAsyncApi(host, port, baud_rate)
+            try:
+                result = await api.async_probe()
+            except Exception as err:
+                # whatever else answers on the port, e.g. with more than a StreamReader's limit and no prompt,
+                # is just not an SW42DA, it mustn't end the scan
+                _LOGGER.debug("No SW42DA at %s: %r", host, err)
+                return None
+            finally:
+                await api.async_close()
+        return {
+            "host": host,
+            "port": port,
+            "mac": result["Mac"],
+            "local": result.get("Local"),
+            "fw_version": result["FW Version"],
+        }
+
+    found = await asyncio.gather(*(probe(host) for host in hosts))
+    return [unit for unit in found if unit is not None]
@@ -1,6 +1,5 @@
 """Platform for sensor integration."""
 import logging
-from collections import defaultdict
 from dataclasses import dataclass
 from typing import Callable, Any
 
@@ -11,6 +10,7 @@ from homeassistant.core import HomeAssistant
 
 from . import Sw42daCoordinator
 from .entity import Sw42daEntity
+from .model import StatusSnapshot
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,9 +18,11 @@ _LOGGER = logging.getLogger(__name__)
 
 @dataclass(frozen=True)
 class Sw42daSwitchDescription(SwitchEntityDescription):
-    state: Callable[[defaultdict], Any] | None = None
+    state: Callable[[StatusSnapshot], Any] | None = None
     turn_on_command: str | None = None
     turn_off_command: str | None = None
+    # where state reads the value from, set optimistically to "On" or "Off" when switched
+    data_key: tuple | None = None
 
 
 SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
@@ -28,6 +30,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="main_volume_mute",
         name="Main Volume Mute",
         state=lambda data: data["AudioOut"][0]["Mute"]=="On",
+        data_key=("AudioOut", 0, "Mute"),
         turn_on_command="MUTE ON",
         turn_off_command="MUTE OFF",
     ),
@@ -35,6 +38,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="multichannel_line_volume_mute",
         name="Multichannel Line Volume Mute",
         state=lambda data: data["AudioOut"][1]["Mute"]=="On",
+        data_key=("AudioOut", 1, "Mute"),
         turn_on_command="OUT 21 MUTE ON",
         turn_off_command="OUT 21 MUTE OFF",
     ),
@@ -42,6 +46,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="downmix_line_volume_mute",
         name="Downmix Line Volume Mute",
         state=lambda data: data["AudioOut"][2]["Mute"]=="On",
+        data_key=("AudioOut", 2, "Mute"),
         turn_on_command="OUT 22 MUTE ON",
         turn_off_command="OUT 22 MUTE OFF",
     ),
@@ -49,6 +54,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="multichannel_dante_volume_mute",
         name="Multichannel Dante Volume Mute",
         state=lambda data: data["AudioOut"][3]["Mute"]=="On",
+        data_key=("AudioOut", 3, "Mute"),
         turn_on_command="OUT 23 MUTE ON",
         turn_off_command="OUT 23 MUTE OFF",
     ),
@@ -56,6 +62,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="downmix_dante_volume_mute",
         name="Downmix Dante Volume Mute",
         state=lambda data: data["AudioOut"][4]["Mute"]=="On",
+        data_key=("AudioOut", 4, "Mute"),
         turn_on_command="OUT 24 MUTE ON",
         turn_off_command="OUT 24 MUTE OFF",
     ),
@@ -63,6 +70,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="key_control",
         name="Key Control",
         state=lambda data: data["Key"] == "On",
+        data_key=("Key",),
         turn_on_command="KEY ON",
         turn_off_command="KEY OFF",
     ),
@@ -70,6 +78,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="beep_control",
         name="Onboard Beep",
         state=lambda data: data["Beep"] == "On",
+        data_key=("Beep",),
         turn_on_command="BEEP ON",
         turn_off_command="BEEP OFF",
     ),
@@ -77,6 +86,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="lcd_always_on",
         name="LCD Always On",
         state=lambda data: data["LCD"] == "On",
+        data_key=("LCD",),
         turn_on_command="LCD ON",
         turn_off_command="LCD OFF",
     ),
@@ -84,6 +94,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="cec_volume_control",
         name="CEC Volume Control",
         state=lambda data: data["CEC_Control"] == "On",
+        data_key=("CEC_Control",),
         turn_on_command="CEC ON",
         turn_off_command="CEC OFF",
     ),
@@ -91,6 +102,7 @@ SWITCHES: tuple[Sw42daSwitchDescription, ...] = (
         key="power",
         name="Power",
         state=lambda data: data["Power"] == "On",
+        data_key=("Power",),
         turn_on_command="PON",
         turn_off_command="POFF",
     ),
@@ -122,8 +134,7 @@ class Sw42daSwitch(Sw42daEntity, SwitchEntity):
     ) -> None:
         super().__init__(coordinator=coordinator)
         self.entity_description = entity_description
-        self.entity_id = f"switch.{DOMAIN}_{entity_description.key}"
-        self._attr_unique_id = f"{DOMAIN}_switch_{entity_description.key}"
+        self._attr_unique_id = f"{coordinator.unique_id_prefix}_switch_{entity_description.key}"
         self._attr_name = entity_description.name
 
     @property
@@ -136,10 +147,7 @@ class Sw42daSwitch(Sw42daEntity, SwitchEntity):
         """Turn the switch on."""
         try:
             _LOGGER.debug("Turning ON %s", self._attr_name)
-            await self.hass.async_add_executor_job(
-                self.send_command, self.entity_description.turn_on_command
-            )
-            await self.coordinator.async_refresh()
+            await self.send_command(self.entity_description.turn_on_command, self._optimistic("On"))
         except Exception as err:
             _LOGGER.error("Failed to turn on %s: %s", self._attr_name, err)
             raise
@@ -148,10 +156,12 @@ class Sw42daSwitch(Sw42daEntity, SwitchEntity):
         """Turn the switch off."""
         try:
             _LOGGER.debug("Turning OFF %s", self._attr_name)
-            await self.hass.async_add_executor_job(
-                self.send_command, self.entity_description.turn_off_command
-            )
-            await self.coordinator.async_refresh()
+            await self.send_command(self.entity_description.turn_off_command, self._optimistic("Off"))
         except Exception as err:
             _LOGGER.error("Failed to turn off %s: %s", self._attr_name, err)
-            raise
\ No newline at end of file
+            raise
+
+    def _optimistic(self, value: str) -> dict[tuple, str]:
+        if self.entity_description.data_key is None:
+            return {}
+        return {self.entity_description.data_key: value}
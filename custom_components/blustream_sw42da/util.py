@@ -5,9 +5,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceEntry, DeviceRegistry
 
-from . import Sw42daCoordinator
+from .coordinator import Sw42daCoordinator
 from .error import ServiceError
-from .const import DATA, DOMAIN
+from .const import DOMAIN
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -17,12 +17,15 @@ async def get_coordinator_by_device_id(
 ) -> "Sw42daCoordinator":
     """Get the ConfigEntry."""
     registry: DeviceRegistry = dr.async_get(hass)
-    dev_entry: DeviceEntry = registry.async_get(device_id)
+    dev_entry: DeviceEntry | None = registry.async_get(device_id)
+    if dev_entry is None:
+        raise ServiceError(f"Unknown device {device_id}")
 
-    config_entry = hass.config_entries.async_get_entry(
-        list(dev_entry.config_entries)[0]
-    )
-    return await get_coordinator(hass, config_entry)
+    for entry_id in dev_entry.config_entries:
+        config_entry = hass.config_entries.async_get_entry(entry_id)
+        if config_entry is not None and config_entry.domain == DOMAIN:
+            return await get_coordinator(hass, config_entry)
+    raise ServiceError("Integration domain mismatch")
 
 async def get_coordinator(
         hass: HomeAssistant, config_entry: ConfigEntry
@@ -34,10 +37,9 @@ async def get_coordinator(
     if config_entry.entry_id not in hass.data.get(DOMAIN, {}):
         raise ServiceError("Integration not loaded for this config entry")
 
-    entry_data = hass.data[DOMAIN][config_entry.entry_id]
-    data = entry_data.get(DATA)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    if data is None or data.coordinator is None:
+    if coordinator is None:
         raise ServiceError("Coordinator not available")
 
-    return data.coordinator
\ No newline at end of file
+    return coordinator
@@ -0,0 +1,38 @@
+"""Load the integration's protocol modules without Home Assistant."""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+COMPONENT = Path(__file__).parent.parent / "custom_components" / "blustream_sw42da"
+PACKAGE = "blustream_sw42da"
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _load(name: str) -> types.ModuleType:
+    """Import a module of the integration, the package's __init__ needs Home Assistant and is left out."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(COMPONENT)]
+        sys.modules[PACKAGE] = package
+    module_name = f"{PACKAGE}.{name}"
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, COMPONENT / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+@pytest.fixture(scope="session")
+def sw42da_api() -> types.ModuleType:
+    return _load("sw42da_api")
+
+
+@pytest.fixture(scope="session")
+def status_raw() -> bytes:
+    """A STATUS response as the device sends it, from the echo of the command to the prompt."""
+    return (FIXTURES / "status.txt").read_bytes()
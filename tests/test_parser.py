@@ -0,0 +1,123 @@
+"""Every way of parsing STATUS must give what parse_result gave before the parse plan existed."""
+
+import json
+
+import pytest
+
+from conftest import FIXTURES
+
+# what the original parse_result returned for each variant, key order included
+EXPECTED = json.loads((FIXTURES / "status_expected.json").read_text(encoding="utf-8"))
+
+FIELDS = frozenset({"FW Version", "Power", "Temp(C)", "Mac", "Local", "Network", "Output", "AudioOut"})
+
+VARIANTS = {
+    "status": lambda raw: raw,
+    "output_row_added": lambda raw: raw.replace(
+        b"Downmix 2CH\r\n",
+        b"Downmix 2CH\r\n03         02         On          Yes          SNK     Auto             Bypass\r\n",
+        1,
+    ),
+    "audio_row_removed": lambda raw: raw.replace(b"Downmix Dante Volume    55         Off      On\r\n", b""),
+    "firmware_changed": lambda raw: raw.replace(b"V1.13", b"V1.14"),
+    "value_misaligned": lambda raw: raw.replace(b"Main Volume             45", b"Main Volume            45 "),
+    "local_non_ascii": lambda raw: raw.replace(b"Lounge SW42DA", "Küche SW42DA".encode()),
+}
+
+# the layout the plan was learnt from, the others must be noticed and parsed from scratch
+PLAN_HOLDS = {"status", "value_misaligned"}
+
+
+def _lines(raw: bytes) -> list[bytes]:
+    """The response as the async client yields it, split after each LF with the prompt last."""
+    *lines, prompt = raw.split(b"\n")
+    return [line + b"\n" for line in lines] + [prompt]
+
+
+@pytest.fixture
+def planned_api(sw42da_api, status_raw):
+    """An api that has learnt its parse plan from the fixture."""
+    api = sw42da_api.Sw42daApi("127.0.0.1", 8000, 57600)
+    api.parse_result(api._split_response(status_raw))
+    assert api._parse_plan is not None
+    return api
+
+
+@pytest.fixture(params=list(VARIANTS))
+def variant(request, status_raw) -> tuple[bytes, dict]:
+    return VARIANTS[request.param](status_raw), EXPECTED[request.param]
+
+
+def _assert_same(result: dict, expected: dict) -> None:
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+def _assert_fields(result: dict, expected: dict) -> None:
+    """A field limited read has at least the fields, the whole response when it fell back to parse_result."""
+    assert FIELDS <= result.keys()
+    assert result == {key: expected[key] for key in result}
+
+
+def test_fixture_matches_the_plan_it_was_learnt_from(sw42da_api, status_raw, planned_api):
+    parser = sw42da_api.StatusStreamParser(planned_api)
+    for line in _lines(status_raw):
+        parser.feed(line)
+    assert parser.streaming
+    assert parser.complete
+
+
+def test_parse_result_without_plan(sw42da_api, variant):
+    raw, expected = variant
+    api = sw42da_api.Sw42daApi("127.0.0.1", 8000, 57600)
+    _assert_same(api.parse_result(api._split_response(raw)), expected)
+
+
+def test_parse_result_with_plan(planned_api, variant):
+    raw, expected = variant
+    _assert_same(planned_api.parse_result(planned_api._split_response(raw)), expected)
+    # the plan learnt again from a changed layout reads the same response again
+    _assert_same(planned_api.parse_result(planned_api._split_response(raw)), expected)
+
+
+def test_parse_status(planned_api, variant):
+    raw, expected = variant
+    _assert_same(planned_api.parse_status(raw), expected)
+    _assert_same(planned_api.parse_status(raw), expected)
+
+
+def test_parse_status_fields(planned_api, variant):
+    raw, expected = variant
+    _assert_fields(planned_api.parse_status(raw, FIELDS), expected)
+
+
+@pytest.mark.parametrize("fields", [None, FIELDS])
+def test_stream_parser(sw42da_api, planned_api, variant, request, fields):
+    raw, expected = variant
+    parser = sw42da_api.StatusStreamParser(planned_api, fields)
+    sections = {}
+    for line in _lines(raw):
+        for _name, values in parser.feed(line):
+            sections.update(values)
+    result = parser.finish()
+
+    name = request.node.callspec.params["variant"]
+    assert parser.streaming == (name in PLAN_HOLDS)
+    if fields is None:
+        _assert_same(result, expected)
+    else:
+        _assert_fields(result, expected)
+    # what was handed out while the response arrived is part of the result
+    assert sections == {key: result[key] for key in sections}
+
+
+def test_lf_cr_line_endings(sw42da_api, status_raw, planned_api):
+    # the original client read the response with readline(), so LF CR endings must parse as CR LF ones do
+    raw = status_raw.replace(b"\r\n", b"\n\r")
+    api = sw42da_api.Sw42daApi("127.0.0.1", 8000, 57600)
+    _assert_same(api.parse_result(api._split_response(raw)), EXPECTED["status"])
+    _assert_same(api.parse_status(raw), EXPECTED["status"])
+    parser = sw42da_api.StatusStreamParser(planned_api)
+    for line in _lines(raw):
+        parser.feed(line)
+    _assert_same(parser.finish(), EXPECTED["status"])